@@ -0,0 +1,36 @@
+""" Micro-benchmark of AbbreviationTranslator.translate_string over labels
+of all patterns, with and without the memo
+
+Run from the repository root:
+
+    python benchmarks/translate_string.py
+"""
+
+import timeit
+
+from inflection_generator import patterns
+from inflection_generator.abbreviation_translator import AbbreviationTranslator
+
+NUMBER = 100
+
+
+def main() -> None:
+    translator = AbbreviationTranslator(script='cyrl')
+
+    labels = []
+    for pattern in patterns.registry().values():
+        labels.extend(pattern.labels)
+        labels.extend(pattern.columns)
+
+    # Labels repeat across patterns, so the memo would serve all but the first
+    # translation of a label, the translation path is timed without it
+    translations = len(labels) * NUMBER
+    for name, translate in [
+            ("translated", translator._translate_string),  # pylint: disable=protected-access
+            ("memoized", translator.translate_string)]:
+        seconds = timeit.timeit(lambda: [translate(label) for label in labels], number=NUMBER)
+        print(f"{translations} {name} labels in {seconds:.3f} s, {seconds / translations * 1e6:.2f} us per label")
+
+
+if __name__ == "__main__":
+    main()
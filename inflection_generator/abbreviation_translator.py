@@ -1,9 +1,13 @@
+import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Tuple
 
-import pandas
+from inflection_generator import patterns, settings
+from inflection_generator.memo import LruMemo
+from inflection_generator.workbook import load_workbook
 
-from inflection_generator import settings
+# Translations kept in the memo at most
+MEMO_SIZE = 4096
 
 
 class AbbreviationTranslator:
@@ -13,6 +17,7 @@ class AbbreviationTranslator:
         overrides_file (Path): Path to table file with abbreviations list which
             are overrides and extends default declencions file
         separators (Path): String of chars which mark bounds of tokens
+        memo (LruMemo): Translations of strings keyed by script and string
     """
 
     overrides_file = settings.DECLENSIONS_AND_CONJUGATIONS_OVERRIDES_FILE
@@ -24,6 +29,7 @@ class AbbreviationTranslator:
             of the declencions file
         """
         self._script = script
+        self.memo: LruMemo[str] = LruMemo("abbreviation translations", MEMO_SIZE)
         abbrev_dict = self._dict_from_file(declensions_file)
         override_dict = self._dict_from_file(self.overrides_file)
         abbrev_dict.update(override_dict)
@@ -31,11 +37,10 @@ class AbbreviationTranslator:
         self.set_dict(abbrev_dict)
 
     def _dict_from_file(self, file_path: Path) -> Dict[str, str]:
-        abbrev_frame = pandas.read_excel(
-            file_path,
-            sheet_name="abbreviations",
-            dtype=str,
-            keep_default_na=True,)
+        abbrev_frame = load_workbook(file_path).abbreviations
+
+        if abbrev_frame is None:
+            raise RuntimeError(f"No abbreviations sheet in {file_path}")
 
         if self._script not in abbrev_frame:
             raise RuntimeError(f"No script variant {self._script} for abbreviations in {file_path}")
@@ -48,44 +53,32 @@ class AbbreviationTranslator:
 
         return dict(zip(abbreviations, translates))
 
-    def _replace(self, string: str, key: str) -> str:
-        if key not in string:
-            return string
-
-        result = ''
-        buf = ''
-        key_ind = 0
-
-        for s_ind, ch in enumerate(string):
-            if ch == key[key_ind]:
-                buf += ch
-                key_ind += 1
-                if key_ind == len(key):
-                    # Check if token is bounded
-                    if ((result == '' or result[-1] in self.separators) and
-                            (s_ind == len(string) - 1 or string[s_ind + 1] in self.separators)):
-                        result += self._abbrev_dict[key]
-                    else:
-                        result += buf
-                    buf = ''
-                    key_ind = 0
-            else:
-                if key_ind == 0:
-                    result += ch
-                else:
-                    result += buf + ch
-                    key_ind = 0
-                    buf = ''
-
-        result += buf
-
-        return result
+    def _split(self, string: str) -> List[str]:
+        """ Split string to tokens and separators between them, tokens are at
+        even positions
+        """
+        return self._separators_re.split(string)
 
     def set_dict(self, abbrev_dict: Dict[str, str]) -> None:
         """ Override innder dictionary
         """
+        self.memo.clear()
         self._abbrev_dict = abbrev_dict
         self._len_sorted_keys = sorted(list(abbrev_dict), key=len, reverse=True)
+        self._separators_re = re.compile(f"([{re.escape(self.separators)}])")
+
+        # Single token keys and keys of several tokens by their tokens and
+        # separators, with ranks as longer keys are translated first
+        self._token_keys: Dict[str, Tuple[int, str]] = {}
+        self._multi_token_keys: Dict[Tuple[str, ...], Tuple[int, str]] = {}
+        for rank, key in enumerate(self._len_sorted_keys):
+            parts = tuple(self._split(key))
+            if len(parts) == 1:
+                self._token_keys[key] = (rank, key)
+            elif key:
+                self._multi_token_keys[parts] = (rank, key)
+        self._multi_token_lengths = sorted({len(parts) for parts in self._multi_token_keys})
+        self._multi_token_starts = {parts[0] for parts in self._multi_token_keys}
 
     def get(self, key: str, default=None) -> str:
         """ Get translation for token, if exists
@@ -96,9 +89,54 @@ class AbbreviationTranslator:
         """ Translate known tokens in an arbitrary string
 
         Methods translates only tokens which are bounded with separtator chars
-        or string bounds.
+        or string bounds. Matches of all keys are found in one pass over the
+        tokens, overlapping matches are taken by longer keys first and then
+        from left to right. Translations are kept in the memo.
         """
-        for key in self._len_sorted_keys:
-            string = self._replace(string, key)
+        return self.memo.get((self._script, string), lambda: self._translate_string(string))
+
+    def warm(self) -> int:
+        """ Translate row and column labels of tables of all patterns of the
+        registry, so tables get them from the memo
+
+        :return: Number of translated labels
+        """
+        labels = set()
+        for pattern in patterns.registry().values():
+            table = pattern.to_table()
+            labels.update(table.columns[::2])
+            labels.update(table.index)
+
+        for label in labels:
+            self.translate_string(label)
+
+        return len(labels)
+
+    def _translate_string(self, string: str) -> str:
+        parts = self._split(string)
+
+        matches = []
+        for start in range(0, len(parts), 2):
+            match = self._token_keys.get(parts[start])
+            if match is not None:
+                matches.append((match[0], start, 1, match[1]))
+            if parts[start] not in self._multi_token_starts:
+                continue
+            for length in self._multi_token_lengths:
+                if start + length > len(parts):
+                    break
+                match = self._multi_token_keys.get(tuple(parts[start:start + length]))
+                if match is not None:
+                    matches.append((match[0], start, length, match[1]))
+
+        if not matches:
+            return string
+
+        taken = [False] * len(parts)
+        for _rank, start, length, key in sorted(matches):
+            if any(taken[start:start + length]):
+                continue
+            taken[start:start + length] = [True] * length
+            parts[start:start + length] = [self._abbrev_dict[key]] + [""] * (length - 1)
 
-        return string
+        return "".join(parts)
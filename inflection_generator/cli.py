@@ -1,59 +1,122 @@
 import argparse
+import os
+from typing import Optional
 
 from rich import print  # pylint: disable=redefined-builtin
 
-from inflection_generator import modules, settings
+from inflection_generator import manifest, memo, modules, planner, translit
+from inflection_generator.abbreviation_translator import AbbreviationTranslator
 from inflection_generator.helpers import Kind, timeis
+from inflection_generator.planner import WorkPlan
+
+# Value of --kind for all kinds
+ALL_KINDS = "all"
 
 
 def get_argparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--kind", required=True, choices=[i.name for i in Kind])
+    parser.add_argument(
+        "--kind", required=True, nargs="+", choices=[i.name for i in Kind] + [ALL_KINDS],
+        help="kinds of html tables to generate, shared stages run once for all of them")
     parser.add_argument("--class-file-name", type=str, default='1')
+    parser.add_argument(
+        "--explain", metavar="PATTERN",
+        help="print headwords which would be rebuilt on change of the pattern and exit")
+    parser.add_argument(
+        "--plan-only", action="store_true",
+        help="print numbers of headwords to be generated by every stage and exit")
+    parser.add_argument(
+        "--translit-engine", choices=list(translit.ENGINES), default=translit.NATIVE,
+        help="engine of Cyrillic and Devanagari transliteration, aksharamukha is an optional dependency")
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="number of worker processes of transliteration and html tables, 0 for the number of CPUs")
+    parser.add_argument(
+        "--legacy-pickles", action="store_true",
+        help="also write inflections as per-headword pickles of previous versions")
     return parser
 
 
 def generate_inflections(args: argparse.Namespace) -> None:
     print(f"{timeis()} ----------------------------------------")
 
-    inflection_table_index = modules.create_inflection_table_index()
-    inflection_table = modules.create_inflection_table_df()
+    pattern_store = modules.load_pattern_store()
+    inflection_table_index = pattern_store.index
+
+    kinds = [kind for kind in Kind if kind.name in args.kind or ALL_KINDS in args.kind]
+    jobs = args.jobs or os.cpu_count() or 1
 
-    modules.test_inflection_pattern_changed(inflection_table_index, inflection_table)
+    kinds_data = {kind: modules.create_data_frame(modules.data_file(kind, args.class_file_name))[0] for kind in kinds}
+    kinds_headwords = {kind: data['pali_1'].tolist() for kind, data in kinds_data.items()}
 
-    kind = Kind[args.kind]
+    # Shared stages run once for headwords of all kinds
+    data, headwords = modules.combine_data_frames(list(kinds_data.values()))
 
-    if kind is Kind.DPS:
-        csv_file = settings.DPS_DIR/"spreadsheets"/"dps-full.csv"
-    elif kind is Kind.SBS:
-        csv_file = settings.DPS_DIR/"word-frequency"/"csv-for-examples"/f"{args.class_file_name}-class.csv"
-    data, headwords = modules.create_data_frame(csv_file)
+    if args.explain is not None:
+        modules.explain_pattern(args.explain, data)
+        return
 
+    pattern_changed = modules.test_inflection_pattern_changed(pattern_store)
+
+    # HTML tables of a kind are planned only for its own headwords
+    plan = WorkPlan(
+        planner.stages(kinds),
+        {manifest.HTML_TABLES[kind]: kind_headwords for kind, kind_headwords in kinds_headwords.items()})
     modules.test_for_missing_stem_and_pattern(data)
     modules.test_for_wrong_patterns(inflection_table_index, data)
-    modules.test_for_differences_in_stem_and_pattern(data)
-    modules.test_if_inflections_exist_dps(data)
-    modules.test_if_inflections_exist_suttas(data)  # nu
-    modules.generate_changed_inflected_forms(data)
-    diff = modules.combine_old_and_new_dataframes()
+    change_manifest = modules.test_for_differences_in_stem_and_pattern(data, plan, pattern_changed, kinds_data)
+    # Nothing is written before the plan is reported
+    modules.test_if_inflections_exist_dps(data, plan, read_only=args.plan_only)
+    modules.test_if_inflections_exist_suttas(data, plan, read_only=args.plan_only)  # nu
+    plan.print_summary()
 
-    table_generator = modules.InflectionTableGenerator(data, inflection_table_index, kind)
-    table_generator.generate_html()
+    if args.plan_only:
+        return
 
-    modules.generate_inflections_in_table_list(data)
-    modules.transcribe_new_inflections()
+    modules.generate_changed_inflected_forms(data, plan)
+    diff = modules.combine_old_and_new_dataframes()
+    modules.update_form_index(headwords)
+
+    # Labels are translated only if there are tables to render
+    html_kinds = [kind for kind in kinds if plan.items(manifest.HTML_TABLES[kind])]
+    translator: Optional[AbbreviationTranslator] = None
+    if html_kinds:
+        translator = AbbreviationTranslator(script='cyrl')
+        if Kind.DPS in html_kinds:
+            print(f"{timeis()} {translator.warm()} table labels translated")
+
+    for kind in html_kinds:
+        table_generator = modules.InflectionTableGenerator(
+            kinds_data[kind], inflection_table_index, kind, translator)
+        table_generator.generate_html(plan, jobs)
+
+    modules.generate_inflections_in_table_list(data, plan)
+    modules.transcribe_new_inflections(args.translit_engine, jobs)
     diff_translit = modules.combine_old_and_new_translit_dataframes()
-    modules.export_translit_to_pickle(diff_translit)
-    modules.export_inflections_to_pickle(diff)
+    modules.export_translit_to_store(diff_translit)
+    modules.export_inflections_to_store(diff)
+    modules.export_inflection_patterns(pattern_store, pattern_changed)
     modules.delete_unused_inflection_patterns(inflection_table_index)
-    modules.delete_old_pickle_files(headwords)
-    modules.delete_unused_html_tables(headwords)
+    modules.save_change_manifest(change_manifest, headwords, kinds_headwords)
+    modules.delete_unused_html_tables(kinds_headwords)
     modules.delete_unused_inflections(headwords)
     modules.delete_unused_inflections_translit(headwords)
+    if args.legacy_pickles:
+        modules.export_legacy_pickles()
+
+    print_summary(translator)
 
     print(f"{timeis()} ----------------------------------------")
 
 
+def print_summary(translator: Optional[AbbreviationTranslator]) -> None:
+    print(f"{timeis()} [green]run summary")
+    for line in memo.generation.summary():
+        print(line)
+    if translator is not None:
+        print(translator.memo.summary())
+
+
 def main() -> None:
     ARGS = get_argparser().parse_args()
     generate_inflections(ARGS)
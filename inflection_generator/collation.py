@@ -0,0 +1,61 @@
+""" Pāli alphabetical order
+
+Words are split to letters of the alphabet with a single precompiled regex,
+aspirated consonants are single letters. Sort keys are bytes with a byte per
+letter, so they are compact and compared by memcmp.
+"""
+
+import functools
+import re
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+Item = TypeVar("Item")
+
+ALPHABET: List[str] = [
+    "√", "a", "ā", "i", "ī", "u", "ū", "e", "o", "k", "kh", "g", "gh", "ṅ",
+    "c", "ch", "j", "jh", "ñ", "ṭ", "ṭh", "ḍ", "ḍh", "ṇ", "t", "th", "d",
+    "dh", "n", "p", "ph", "b", "bh", "m", "y", "r", "l", "s", "v", "h",
+    "ḷ", "ṃ", " ", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0",
+]
+
+# Letters rank from 1, 0 marks a character out of the alphabet
+RANKS: Dict[str, int] = {letter: rank for rank, letter in enumerate(ALPHABET, start=1)}
+
+# Aspirated consonants are tried before their first letter, any other
+# character is matched alone
+_LETTER_RE = re.compile(
+    "|".join(re.escape(letter) for letter in sorted(ALPHABET, key=len, reverse=True)) + "|.",
+    re.DOTALL)
+
+# Words sorted at once seldom have more unique keys than this
+KEY_CACHE_SIZE = 1 << 17
+
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def sort_key(word: str) -> bytes:
+    """ Make key which orders words as the Pāli alphabet
+
+    A character out of the alphabet is a zero byte followed by its code
+    point in three bytes, so such characters go before letters and are
+    ordered by their code points.
+    """
+    key = bytearray()
+    for letter in _LETTER_RE.findall(word):
+        rank = RANKS.get(letter)
+        if rank is not None:
+            key.append(rank)
+        else:
+            key.append(0)
+            key.extend(ord(letter).to_bytes(3, "big"))
+    return bytes(key)
+
+
+def sort_pali(items: Iterable[Item], key: Optional[Callable[[Item], str]] = None) -> List[Item]:
+    """ Sort items in the Pāli order, keys of repeated words are made once
+
+    :param key: Function which gets a word of an item, items are words by
+        default
+    """
+    if key is None:
+        return sorted(items, key=sort_key)  # type: ignore[arg-type]
+    return sorted(items, key=lambda item: sort_key(key(item)))
@@ -0,0 +1,46 @@
+import functools
+from typing import List, NamedTuple, Sequence
+
+import numpy
+
+from inflection_generator.patterns import Pattern
+
+
+class SuffixVector(NamedTuple):
+    """ Suffixes of all cells of a pattern flattened in the table order
+
+    Attributes:
+        suffixes (numpy.ndarray): Suffixes, a cell with several suffixes gives
+            several items
+        empty (numpy.ndarray): Mask of empty suffixes which are not prefixed
+            with a stem
+    """
+    suffixes: numpy.ndarray
+    empty: numpy.ndarray
+
+
+@functools.lru_cache(maxsize=None)
+def suffix_vector(pattern: Pattern) -> SuffixVector:
+    suffixes = [
+        suffix
+        for row in pattern.suffixes
+        for cell in row
+        for suffix in cell]
+    array = numpy.array(suffixes, dtype=str)
+    return SuffixVector(suffixes=array, empty=array == "")
+
+
+def inflect(pattern: Pattern, stems: Sequence[str]) -> List[str]:
+    """ Make inflections string for every stem in one vectorized step
+
+    The string is space separated stem + suffix forms of all cells of the
+    pattern, each cell is followed by a space.
+    """
+    vector = suffix_vector(pattern)
+    if not vector.suffixes.size:
+        return ["" for _ in stems]
+
+    forms = numpy.char.add(numpy.array(stems, dtype=str)[:, None], vector.suffixes[None, :])
+    forms[:, vector.empty] = ""
+
+    return [" ".join(row) + " " for row in forms.tolist()]
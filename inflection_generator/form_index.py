@@ -0,0 +1,260 @@
+import mmap
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy
+
+MAGIC = b"IGFORMS1"
+
+# Magic, build id, numbers of headwords, forms and postings, sizes of
+# headwords and forms strings
+HEADER = struct.Struct("<8s6Q")
+
+# Overlay of a larger size is merged into the base on the next update
+COMPACT_THRESHOLD = 2000
+
+
+class FormIndexError(Exception):
+    pass
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _layout(header: tuple) -> Dict[str, Tuple[int, int]]:
+    """ Get byte offsets and sizes of sections which follow the header
+    """
+    _magic, _build_id, n_headwords, n_forms, n_postings, headwords_size, forms_size = header
+    sizes = [
+        ("headword offsets", (n_headwords + 1) * 8),
+        ("form offsets", (n_forms + 1) * 8),
+        ("posting offsets", (n_forms + 1) * 8),
+        ("postings", n_postings * 4),
+        ("headwords", headwords_size),
+        ("forms", forms_size),
+    ]
+    layout = {}
+    offset = HEADER.size
+    for name, size in sizes:
+        offset = _aligned(offset)
+        layout[name] = (offset, size)
+        offset += size
+    return layout
+
+
+def _strings(values: List[bytes]) -> Tuple[numpy.ndarray, bytes]:
+    offsets = numpy.zeros(len(values) + 1, dtype=numpy.uint64)
+    numpy.cumsum([len(value) for value in values], out=offsets[1:])
+    return offsets, b"".join(values)
+
+
+def build(path: Path, items: Iterable[Tuple[str, List[str]]]) -> None:
+    """ Write index of forms of headwords, an overlay of the previous index
+    is discarded
+
+    Forms are sorted by their UTF-8 bytes, every form is followed by the
+    sorted ids of headwords which produce it.
+    """
+    forms_by_headword = dict(items)
+    headwords = sorted(forms_by_headword)
+
+    postings_by_form: Dict[bytes, List[int]] = {}
+    for headword_id, headword in enumerate(headwords):
+        for form in dict.fromkeys(forms_by_headword[headword]):
+            postings_by_form.setdefault(form.encode(), []).append(headword_id)
+
+    forms = sorted(postings_by_form)
+    postings = [postings_by_form[form] for form in forms]
+
+    headword_offsets, headwords_bytes = _strings([headword.encode() for headword in headwords])
+    form_offsets, forms_bytes = _strings(forms)
+    posting_offsets = numpy.zeros(len(forms) + 1, dtype=numpy.uint64)
+    numpy.cumsum([len(ids) for ids in postings], out=posting_offsets[1:])
+    postings_array = numpy.fromiter(
+        (headword_id for ids in postings for headword_id in ids),
+        dtype=numpy.uint32, count=int(posting_offsets[-1]))
+
+    header = (
+        MAGIC, int.from_bytes(os.urandom(8), "little"),
+        len(headwords), len(forms), len(postings_array), len(headwords_bytes), len(forms_bytes))
+    sections = {
+        "headword offsets": headword_offsets.tobytes(),
+        "form offsets": form_offsets.tobytes(),
+        "posting offsets": posting_offsets.tobytes(),
+        "postings": postings_array.tobytes(),
+        "headwords": headwords_bytes,
+        "forms": forms_bytes,
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as index_file:
+        index_file.write(HEADER.pack(*header))
+        for name, (offset, _size) in _layout(header).items():
+            index_file.write(b"\0" * (offset - index_file.tell()))
+            index_file.write(sections[name])
+    tmp_path.replace(path)
+
+    try:
+        os.remove(_overlay_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def _overlay_path(path: Path) -> Path:
+    return path.with_name(path.stem + " overlay.pickle")
+
+
+class FormIndex:
+    """ Memory-mapped inverted index from inflected forms to headwords
+
+    The base index is opened without reading it, lookups are binary searches
+    over the mapped file. Headwords changed after the base was built are kept
+    in a small overlay which shadows them in the base.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        with open(path, "rb") as index_file:
+            self._mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = HEADER.unpack_from(self._mmap)
+        if header[0] != MAGIC:
+            self._mmap.close()
+            raise FormIndexError(f"{path} is not a form index")
+        self.build_id = header[1]
+
+        layout = _layout(header)
+        self._headword_offsets = self._array(layout["headword offsets"], numpy.uint64)
+        self._form_offsets = self._array(layout["form offsets"], numpy.uint64)
+        self._posting_offsets = self._array(layout["posting offsets"], numpy.uint64)
+        self._postings = self._array(layout["postings"], numpy.uint32)
+        self._headwords_start = layout["headwords"][0]
+        self._forms_start = layout["forms"][0]
+        self._n_forms = header[3]
+
+        # Forms by headwords, empty list for a deleted headword
+        self.overlay: Dict[str, List[str]] = {}
+        self._overlay_postings: Dict[str, Set[str]] = {}
+        self._load_overlay()
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["FormIndex"]:
+        """ Open index, None if it is missing or broken
+        """
+        try:
+            return cls(path)
+        except (FileNotFoundError, ValueError, struct.error, FormIndexError):
+            return None
+
+    def close(self) -> None:
+        # Arrays keep the map exported, it can't be closed before them
+        del self._headword_offsets, self._form_offsets, self._posting_offsets, self._postings
+        self._mmap.close()
+
+    def _array(self, section: Tuple[int, int], dtype) -> numpy.ndarray:
+        offset, size = section
+        return numpy.frombuffer(self._mmap, dtype=dtype, count=size // numpy.dtype(dtype).itemsize, offset=offset)
+
+    def _load_overlay(self) -> None:
+        try:
+            with open(_overlay_path(self.path), "rb") as overlay_file:
+                build_id, overlay = pickle.load(overlay_file)
+        except FileNotFoundError:
+            return
+        if build_id != self.build_id:
+            raise FormIndexError(f"overlay of {self.path} belongs to another build")
+        self._set_overlay(overlay)
+
+    def _set_overlay(self, overlay: Dict[str, List[str]]) -> None:
+        self.overlay = overlay
+        self._overlay_postings = {}
+        for headword, forms in overlay.items():
+            for form in forms:
+                self._overlay_postings.setdefault(form, set()).add(headword)
+
+    def _headword(self, headword_id: int) -> str:
+        start = self._headwords_start + int(self._headword_offsets[headword_id])
+        end = self._headwords_start + int(self._headword_offsets[headword_id + 1])
+        return self._mmap[start:end].decode()
+
+    def _form(self, form_id: int) -> bytes:
+        start = self._forms_start + int(self._form_offsets[form_id])
+        end = self._forms_start + int(self._form_offsets[form_id + 1])
+        return self._mmap[start:end]
+
+    def _lower_bound(self, key: bytes) -> int:
+        low, high = 0, self._n_forms
+        while low < high:
+            middle = (low + high) // 2
+            if self._form(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _base_headwords(self, form_id: int) -> List[str]:
+        ids = self._postings[int(self._posting_offsets[form_id]):int(self._posting_offsets[form_id + 1])]
+        headwords = (self._headword(headword_id) for headword_id in ids.tolist())
+        return [headword for headword in headwords if headword not in self.overlay]
+
+    def exact(self, form: str) -> List[str]:
+        """ Get sorted headwords which produce the form
+        """
+        key = form.encode()
+        form_id = self._lower_bound(key)
+        result = set(self._overlay_postings.get(form, ()))
+        if form_id < self._n_forms and self._form(form_id) == key:
+            result.update(self._base_headwords(form_id))
+        return sorted(result)
+
+    def prefix(self, prefix: str) -> Dict[str, List[str]]:
+        """ Get sorted headwords by all forms which start with the prefix
+        """
+        key = prefix.encode()
+        result: Dict[str, Set[str]] = {}
+
+        # 0xff never occurs in UTF-8, so it follows any continuation
+        end = self._lower_bound(key + b"\xff")
+        for form_id in range(self._lower_bound(key), end):
+            headwords = self._base_headwords(form_id)
+            if headwords:
+                result.setdefault(self._form(form_id).decode(), set()).update(headwords)
+
+        for form, headwords in self._overlay_postings.items():
+            if form.startswith(prefix):
+                result.setdefault(form, set()).update(headwords)
+
+        return {form: sorted(result[form]) for form in sorted(result, key=str.encode)}
+
+    def headwords(self) -> Set[str]:
+        n_headwords = len(self._headword_offsets) - 1
+        result = {self._headword(headword_id) for headword_id in range(n_headwords)}
+        for headword, forms in self.overlay.items():
+            if forms:
+                result.add(headword)
+            else:
+                result.discard(headword)
+        return result
+
+    def update(self, items: Iterable[Tuple[str, List[str]]], removed: Iterable[str] = ()) -> None:
+        """ Put changed and removed headwords to the overlay and save it
+        """
+        overlay = dict(self.overlay)
+        overlay.update((headword, list(dict.fromkeys(forms))) for headword, forms in items)
+        overlay.update((headword, []) for headword in removed)
+        self._set_overlay(overlay)
+
+        tmp_path = _overlay_path(self.path).with_suffix(".tmp")
+        with open(tmp_path, "wb") as overlay_file:
+            pickle.dump((self.build_id, overlay), overlay_file, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(_overlay_path(self.path))
+
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self.overlay) > COMPACT_THRESHOLD
@@ -4,10 +4,6 @@ import string
 
 from datetime import datetime
 
-import pandas
-
-from pandas.errors import EmptyDataError
-
 from inflection_generator import settings
 
 
@@ -20,12 +16,9 @@ def create_directories() -> None:
     dirs = [
         "output/inflections in table/",
         "output/patterns/",
-        "output/pickle test/",
         settings.HTML_SUTTAS_DIR,
         settings.HTML_TABLES_DPS_DIR,
         settings.HTML_TABLES_SBS_DIR,
-        settings.INFLECTIONS_DIR,
-        settings.INFLECTIONS_TRANSLIT_DIR,
         settings.OUTPUT_DIR,
     ]
 
@@ -33,14 +26,6 @@ def create_directories() -> None:
         os.makedirs(str(d), exist_ok=True)
 
 
-def data_frame_from_inflections_csv(file) -> pandas.DataFrame:
-    try:
-        result = pandas.read_csv(file, header=None, sep="\t")
-    except (FileNotFoundError, EmptyDataError):
-        result = pandas.DataFrame(data={0: [], 1: []})
-    return result
-
-
 def timeis():
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     return f"[blue]{current_time}[/blue]"
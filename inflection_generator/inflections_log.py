@@ -0,0 +1,123 @@
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas
+from pandas.errors import EmptyDataError
+
+from inflection_generator.collation import sort_pali
+
+UPSERT = "+"
+DELETE = "-"
+
+# Log larger than this part of the base is merged into the base
+COMPACT_RATIO = 0.1
+
+
+def _log_path(base_path: Path) -> Path:
+    return base_path.with_name(base_path.stem + " log" + base_path.suffix)
+
+
+def _read_base(path: Path) -> pandas.DataFrame:
+    try:
+        return pandas.read_csv(path, header=None, sep="\t", dtype=str, keep_default_na=False)
+    except (FileNotFoundError, EmptyDataError):
+        return pandas.DataFrame(data={0: [], 1: []}, dtype=str)
+
+
+class InflectionsFile:
+    """ Headword and inflections CSV file with an append-only log of changes
+
+    Upserts and deletes are appended to the log, so a run writes only the
+    changed rows. Readers get the merged view of the base and the log, the
+    base is rewritten in the Pāli order of headwords by compaction once the
+    log grows large enough.
+
+    Every log line is an operation, a headword and inflections of an upsert
+    separated with tabs.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.log_path = _log_path(path)
+
+    def append(self, upserts: Iterable[Tuple[str, str]] = (), deletes: Iterable[str] = ()) -> int:
+        """ Append operations to the log
+
+        :return: Number of appended operations
+        """
+        lines = [f"{UPSERT}\t{headword}\t{inflections}\n" for headword, inflections in upserts]
+        lines.extend(f"{DELETE}\t{headword}\n" for headword in deletes)
+        if lines:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a") as log_file:
+                log_file.writelines(lines)
+        return len(lines)
+
+    def _read_log(self) -> Dict[str, Optional[str]]:
+        """ Get the last operation of every headword, None for delete
+        """
+        operations: Dict[str, Optional[str]] = {}
+        try:
+            with open(self.log_path, "r") as log_file:
+                for line in log_file:
+                    operation, headword, *inflections = line.rstrip("\n").split("\t", 2)
+                    operations[headword] = inflections[0] if operation == UPSERT else None
+        except FileNotFoundError:
+            pass
+        return operations
+
+    def read(self) -> pandas.DataFrame:
+        """ Get merged view of the base and the log
+
+        Changed rows keep their position in the base, new rows follow in the
+        order they were logged.
+
+        :return: Frame with headwords in column 0 and inflections in column 1
+        """
+        base = _read_base(self.path)
+        operations = self._read_log()
+        if not operations:
+            return base
+
+        changed = base[0].map(operations)
+        logged = base[0].isin(operations.keys())
+        base.loc[logged, 1] = changed[logged]
+        base = base[~(logged & changed.isna())]
+
+        known = set(base[0])
+        added = [
+            (headword, inflections) for headword, inflections in operations.items()
+            if inflections is not None and headword not in known]
+        if added:
+            base = pandas.concat([base, pandas.DataFrame(added, dtype=str)], ignore_index=True)
+
+        return base.reset_index(drop=True)
+
+    def log_size(self) -> int:
+        try:
+            return self.log_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def needs_compaction(self) -> bool:
+        log_size = self.log_size()
+        if not log_size:
+            return False
+        try:
+            base_size = self.path.stat().st_size
+        except FileNotFoundError:
+            base_size = 0
+        return log_size > base_size * COMPACT_RATIO
+
+    def compact(self) -> None:
+        """ Rewrite the base with the merged view sorted by headwords and
+        clear the log
+        """
+        merged = self.read()
+        headwords = merged[0].tolist()
+        merged = merged.iloc[sort_pali(range(len(headwords)), key=headwords.__getitem__)]
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        merged.to_csv(tmp_path, sep="\t", index=None, header=False)
+        tmp_path.replace(self.path)
+        self.log_path.unlink()
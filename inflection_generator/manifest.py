@@ -0,0 +1,230 @@
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy
+import pandas
+
+from inflection_generator import settings
+from inflection_generator.helpers import Kind
+
+FORMAT_VERSION = 2
+
+# Artifacts generated for headwords and columns of the data frame they depend on
+INFLECTIONS = "inflections"
+TABLE_LISTS = "inflections in table"
+HTML_TABLES_DPS = "html tables dps"
+HTML_TABLES_SBS = "html tables sbs"
+
+# HTML tables are generated from the data of their kind, so they are tracked
+# separately, other artifacts are shared by all kinds
+HTML_TABLES: Dict[Kind, str] = {Kind.DPS: HTML_TABLES_DPS, Kind.SBS: HTML_TABLES_SBS}
+
+# HTML tables of any kind tracked by previous versions, dropped on load
+LEGACY_HTML_TABLES = "html tables"
+
+HTML_TABLES_COLUMNS = ['pali_1', "stem", "pattern", 'pos', "like"]
+
+ARTIFACT_COLUMNS: Dict[str, List[str]] = {
+    INFLECTIONS: ['pali_1', "stem", "pattern"],
+    TABLE_LISTS: ['pali_1', "stem", "pattern", 'pos'],
+    HTML_TABLES_DPS: HTML_TABLES_COLUMNS,
+    HTML_TABLES_SBS: HTML_TABLES_COLUMNS,
+}
+
+SHARED_ARTIFACTS = [INFLECTIONS, TABLE_LISTS]
+
+
+def fingerprint(data: pandas.DataFrame, columns: List[str]) -> pandas.Series:
+    """ Hash columns of all rows at once
+
+    :return: Series of uint64 hashes indexed by headwords
+    """
+    hashes = pandas.util.hash_pandas_object(data[columns], index=False)
+    return pandas.Series(hashes.to_numpy(), index=data['pali_1'].to_numpy(), dtype=numpy.uint64)
+
+
+class PatternIndex:
+    """ Reverse index from patterns to headwords inflected by them
+
+    The index is updated incrementally with rows of changed headwords only.
+    """
+
+    def __init__(self) -> None:
+        self._patterns: Dict[str, str] = {}
+        self._headwords: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def headwords(self, pattern: str) -> Set[str]:
+        return self._headwords.get(pattern, set())
+
+    def dependents(self, patterns: Iterable[str]) -> Set[str]:
+        """ Get all headwords inflected by any of the patterns
+        """
+        result: Set[str] = set()
+        for pattern in patterns:
+            result |= self.headwords(pattern)
+        return result
+
+    def update(self, headwords: Iterable[str], patterns: Iterable[str]) -> None:
+        for headword, pattern in zip(headwords, patterns):
+            old_pattern = self._patterns.get(headword)
+            if old_pattern == pattern:
+                continue
+            if old_pattern is not None:
+                self._headwords[old_pattern].discard(headword)
+                if not self._headwords[old_pattern]:
+                    del self._headwords[old_pattern]
+            self._patterns[headword] = pattern
+            self._headwords.setdefault(pattern, set()).add(headword)
+
+    def remove(self, headwords: Iterable[str]) -> None:
+        for headword in headwords:
+            pattern = self._patterns.pop(headword, None)
+            if pattern is None:
+                continue
+            self._headwords[pattern].discard(headword)
+            if not self._headwords[pattern]:
+                del self._headwords[pattern]
+
+
+class ChangeManifest:
+    """ Fingerprints of artifacts of headwords from the previous run kept in
+    a single file
+
+    The file is read at once on load and replaced atomically on save, so an
+    interrupted run leaves the previous manifest intact.
+
+    Attributes:
+        path (Path): Path to the manifest file
+        fingerprints (Dict[str, pandas.Series]): Fingerprints of headwords by
+            artifacts
+        pattern_index (PatternIndex): Headwords by their patterns
+    """
+
+    def __init__(
+            self, path: Path,
+            fingerprints: Optional[Dict[str, pandas.Series]] = None,
+            pattern_index: Optional[PatternIndex] = None) -> None:
+        self.path = path
+        self.fingerprints = fingerprints if fingerprints is not None else {}
+        self.pattern_index = pattern_index if pattern_index is not None else PatternIndex()
+
+    @classmethod
+    def load(cls, path: Path = settings.MANIFEST_FILE) -> "ChangeManifest":
+        """ Load manifest, import per-headword pickles of the legacy "pickle
+        test" directory if there is no manifest of the current format yet
+        """
+        try:
+            with open(path, "rb") as manifest_file:
+                content = pickle.load(manifest_file)
+        except FileNotFoundError:
+            content = None
+
+        if isinstance(content, dict) and content.get("version") == FORMAT_VERSION:
+            # Pattern index is rebuilt if it is missing, HTML tables tracked
+            # without their kind are generated again
+            content["fingerprints"].pop(LEGACY_HTML_TABLES, None)
+            return cls(path, content["fingerprints"], content.get("pattern_index"))
+
+        return cls(path, _read_legacy_dir(settings.LEGACY_PICKLE_TEST_DIR))
+
+    def _previous(self, artifact: str) -> pandas.Series:
+        return self.fingerprints.get(artifact, pandas.Series([], dtype=numpy.uint64))
+
+    def diff(self, artifact: str, fingerprints: pandas.Series) -> pandas.DataFrame:
+        """ Compare fingerprints with the previous run in one pass
+
+        :return: Frame indexed by headwords with "added" and "changed" boolean
+            columns
+        """
+        previous = self._previous(artifact)
+        added = ~fingerprints.index.isin(previous.index)
+
+        changed = numpy.zeros(len(fingerprints), dtype=bool)
+        known_previous = previous.reindex(fingerprints.index[~added]).to_numpy(dtype=numpy.uint64)
+        changed[~added] = known_previous != fingerprints.to_numpy()[~added]
+
+        return pandas.DataFrame({"added": added, "changed": changed}, index=fingerprints.index)
+
+    def sync_pattern_index(self, data: pandas.DataFrame, diff: pandas.DataFrame) -> None:
+        """ Update pattern index with rows of headwords which were added or
+        changed in a way affecting inflections, rebuild it if it is empty
+
+        :param diff: Result of `diff` of inflections fingerprints of the data
+        """
+        if self.pattern_index:
+            dirty = (diff["added"] | diff["changed"]).to_numpy()
+            data = data[dirty]
+        self.pattern_index.update(data['pali_1'], data["pattern"])
+
+    def update(self, artifact: str, fingerprints: pandas.Series) -> None:
+        fingerprints = fingerprints[~fingerprints.index.duplicated(keep="last")]
+        previous = self._previous(artifact)
+        self.fingerprints[artifact] = pandas.concat(
+            [previous[~previous.index.isin(fingerprints.index)], fingerprints])
+
+    def prune(self, headwords: Iterable[str], artifacts: Optional[Iterable[str]] = None) -> Set[str]:
+        """ Remove headwords which are not in the list from the artifacts, from
+        all artifacts by default
+
+        :return: Removed headwords
+        """
+        headwords = pandas.Index(list(headwords))
+        artifacts = list(self.fingerprints) if artifacts is None else [
+            artifact for artifact in artifacts if artifact in self.fingerprints]
+        removed: Set[str] = set()
+        for artifact in artifacts:
+            fingerprints = self.fingerprints[artifact]
+            unused = ~fingerprints.index.isin(headwords)
+            removed.update(fingerprints.index[unused])
+            self.fingerprints[artifact] = fingerprints[~unused]
+            if artifact == INFLECTIONS:
+                self.pattern_index.remove(fingerprints.index[unused])
+        return removed
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as manifest_file:
+            pickle.dump(
+                {
+                    "version": FORMAT_VERSION,
+                    "fingerprints": self.fingerprints,
+                    "pattern_index": self.pattern_index,
+                },
+                manifest_file,
+                protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(self.path)
+
+
+def _read_legacy_dir(path: Path) -> Dict[str, pandas.Series]:
+    """ Convert "headword stem pattern" strings to fingerprints of inflections,
+    other artifacts were not tracked there
+    """
+    rows = []
+
+    if not path.is_dir():
+        return {}
+
+    for entry in os.scandir(path):
+        if not entry.is_file():
+            continue
+        try:
+            with open(entry.path, "rb") as pickle_file:
+                legacy = pickle.load(pickle_file)
+        except (EOFError, pickle.UnpicklingError):
+            continue
+
+        headword = entry.name
+        stem, _, pattern = legacy[len(headword) + 1:].partition(" ")
+        rows.append({'pali_1': headword, "stem": stem, "pattern": pattern})
+
+    if not rows:
+        return {}
+
+    legacy_df = pandas.DataFrame(rows)
+    return {INFLECTIONS: fingerprint(legacy_df, ARTIFACT_COLUMNS[INFLECTIONS])}
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Sequence, TypeVar
+
+Value = TypeVar("Value")
+
+
+class Memo(Generic[Value]):
+    """ Dictionary cache which counts hits and misses
+
+    Attributes:
+        name (str): Name of the memo in the run summary
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups which were computed
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._values: Dict[Hashable, Value] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: Hashable, compute: Callable[[], Value]) -> Value:
+        """ Get cached value for the key, compute and cache it on a miss
+        """
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            value = self._values[key] = compute()
+        else:
+            self.hits += 1
+        return value
+
+    def get_many(
+            self, keys: Iterable[Hashable],
+            compute_many: Callable[[List[Hashable]], Sequence[Value]]) -> List[Value]:
+        """ Get cached values for keys, all missing values are computed with
+        a single call
+
+        :param compute_many: Function which takes a list of unique missing
+            keys and returns their values in the same order
+        """
+        keys = list(keys)
+        missing = list(dict.fromkeys(key for key in keys if key not in self._values))
+
+        if missing:
+            self._values.update(zip(missing, compute_many(missing)))
+
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        return [self._values[key] for key in keys]
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def summary(self) -> str:
+        return f"{self.name}: {self.hits} hits, {self.misses} misses, {self.hit_rate:.1%} hit rate"
+
+
+class LruMemo(Memo[Value]):
+    """ Memo which keeps at most `maxsize` values, the least recently used
+    value is dropped on overflow
+    """
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        super().__init__(name)
+        self.maxsize = maxsize
+        self._values: Dict[Hashable, Value] = OrderedDict()
+
+    def _trim(self) -> None:
+        while len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+
+    def get(self, key: Hashable, compute: Callable[[], Value]) -> Value:
+        value = super().get(key, compute)
+        self._values.move_to_end(key)
+        self._trim()
+        return value
+
+    def get_many(
+            self, keys: Iterable[Hashable],
+            compute_many: Callable[[List[Hashable]], Sequence[Value]]) -> List[Value]:
+        keys = list(keys)
+        values = super().get_many(keys, compute_many)
+        for key in keys:
+            self._values.move_to_end(key)
+        self._trim()
+        return values
+
+
+class GenerationMemo:
+    """ Memos of artifacts shared by homonyms and compounds with the same stem
+    and pattern
+
+    Inflection lists are keyed by (stem, pattern) and HTML tables compiled to
+    parts around the stem by (pattern, kind).
+    """
+
+    def __init__(self) -> None:
+        self.inflections: Memo[str] = Memo("inflections")
+        self.table_lists: Memo[List[str]] = Memo("inflections in table")
+        self.html: Memo[List[str]] = Memo("html tables")
+
+    @property
+    def memos(self) -> List[Memo]:
+        return [self.inflections, self.table_lists, self.html]
+
+    def clear(self) -> None:
+        for memo in self.memos:
+            memo.clear()
+
+    def summary(self) -> List[str]:
+        return [memo.summary() for memo in self.memos if memo.hits or memo.misses]
+
+
+# Memo shared by all stages of the process
+generation = GenerationMemo()
@@ -1,27 +1,32 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from importlib import resources
+import collections
+import functools
 from pathlib import Path
-from typing import List, Dict, Tuple, Union
+from typing import Deque, Iterable, List, Dict, NamedTuple, Optional, Set, Tuple, Union
 import os
 import pickle
 import re
 import webbrowser
 
-from aksharamukha import transliterate
 from pandas_ods_reader import read_ods
 from rich import print  # pylint: disable=redefined-builtin
 import pandas
 
-from inflection_generator import settings
+from inflection_generator import (
+    engine, form_index, manifest, memo, normalizer, patterns, planner, settings, store, translit)
 from inflection_generator.abbreviation_translator import AbbreviationTranslator
-from inflection_generator.helpers import Kind, create_directories, data_frame_from_inflections_csv, excel_index, timeis
-from inflection_generator.sorter import sort_key
+from inflection_generator.collation import sort_pali
+from inflection_generator.helpers import Kind, create_directories, timeis
+from inflection_generator.inflections_log import InflectionsFile
+from inflection_generator.manifest import ChangeManifest
+from inflection_generator.planner import WorkPlan
+from inflection_generator.store import InflectionStore
 
 # TODO Try to avoid global keyword in the module
 # FIXME Too long, split on modules
 
 # Globals
-changed: List[str]
-inflections_not_exist: List[str]
 new_inflections_dict: Dict = {}
 no_eg1_list: List[str]
 no_eg2_list: List[str]
@@ -56,96 +61,39 @@ def create_inflection_table_index() -> pandas.DataFrame:
     print(f"{timeis()} ----------------------------------------")
     print(f"{timeis()} [green]creating inflection table index")
 
-    inflection_table_index_df = pandas.read_excel(
-        settings.DECLENSIONS_AND_CONJUGATIONS_FILE,
-        sheet_name="index",
-        dtype=str,
-        na_filter=False)
-
-    return inflection_table_index_df
+    return patterns.read_index()
 
 
 def create_inflection_table_df() -> pandas.DataFrame:
     print(f"{timeis()} [green]creating inflection table dataframe")
 
-    inflection_table_df = pandas.read_excel(
-        settings.DECLENSIONS_AND_CONJUGATIONS_FILE,
-        sheet_name="declensions",
-        dtype=str,
-        keep_default_na=False)
+    return patterns.read_declensions()
 
-    inflection_table_df = inflection_table_df.shift(periods=2)
 
-    col_length = len(inflection_table_df.columns)
-    inflection_table_df.columns = [excel_index(i) for i in range(col_length)]
-    return inflection_table_df
+def load_pattern_store() -> patterns.PatternStore:
+    print(f"{timeis()} [yellow]inflection generator")
+    print(f"{timeis()} ----------------------------------------")
+    print(f"{timeis()} [green]loading compiled inflection patterns")
 
+    return patterns.load_pattern_store()
 
-def test_inflection_pattern_changed(
-        inflection_table_index: pandas.DataFrame,
-        inflection_table: pandas.DataFrame) -> None:
+
+def test_inflection_pattern_changed(pattern_store: patterns.PatternStore) -> List[str]:
     print(f"{timeis()} [green]test if inflection patterns have changed")
 
-    create_directories()
-    global pattern_changed
     pattern_changed = []
 
-    for row in range(len(inflection_table_index)):
-        inflection_name = inflection_table_index.iloc[row, 0]
-        cell_range = inflection_table_index.iloc[row, 1]
-        like = inflection_table_index.iloc[row, 2]
-        irreg = inflection_table_index.iloc[row, 3]
-
-        col_range_1 = re.sub(r"(.+?)\d*\:.+", "\\1", cell_range)
-        col_range_2 = re.sub(r".+\:(.[A-Z]*)\d*", "\\1", cell_range)
-        row_range_1 = int(re.sub(r".+?(\d{1,3}):.+", "\\1", cell_range))
-        row_range_2 = int(re.sub(r".+:.+?(\d{1,3})", "\\1", cell_range))
-
-        inflection_table_df_filtered = inflection_table.loc[row_range_1:row_range_2, col_range_1:col_range_2]
-        inflection_table_df_filtered.Name = inflection_name
-
-        inflection_table_df_filtered.reset_index(drop=True, inplace=True)
-
-        inflection_table_df_filtered.iloc[0, 0] = ""
+    for inflection_name in pattern_store.patterns:
+        csv_path = settings.PATTERNS_DIR / f"{inflection_name}.csv"
 
-        # replace header
-
-        # Grab the first row for the header
-        new_header = inflection_table_df_filtered.iloc[0]
-        # Take the data less the header row
-        inflection_table_df_filtered = inflection_table_df_filtered[1:]
-        # Set the header row as the df header
-        inflection_table_df_filtered.columns = new_header
-
-        # replace index
-
-        inflection_table_df_filtered.index = inflection_table_df_filtered.iloc[0:, 0]
-        inflection_table_df_filtered = inflection_table_df_filtered.iloc[:, 1:]
-
-        # remove unnamed column headers
-
-        inflection_table_df_filtered = inflection_table_df_filtered.rename(
-            columns=lambda x: re.sub('Unnamed.*', '', x))
-
-        # test
-
-        old = ''
-
-        try:
-            old = pandas.read_csv(f"output/patterns/{inflection_name}.csv", sep="\t", index_col=0, na_filter=False)
-            old = old.rename(columns=lambda x: re.sub('Unnamed.*', '', x))
-        except FileNotFoundError:
+        if not csv_path.is_file():
             print(f"{timeis()} [red]{inflection_name} - doesn't exist - added")
-            pattern_changed.append(inflection_name)
-            inflection_table_df_filtered.to_csv(f"output/patterns/{inflection_name}.csv", sep="\t")
-
-        if inflection_table_df_filtered.equals(old) or inflection_name in pattern_changed:
+        elif inflection_name in pattern_store.changed:
+            print(f"{timeis()} [red]{inflection_name} - different - updated")
+        else:
             continue
 
-        if not inflection_table_df_filtered.equals(old):
-            print(f"{timeis()} [red]{inflection_name} - different - updated")
-            inflection_table_df_filtered.to_csv(f"output/patterns/{inflection_name}.csv", sep="\t")
-            pattern_changed.append(inflection_name)
+        pattern_changed.append(inflection_name)
 
     if pattern_changed == []:
         print("all patterns identical")
@@ -153,6 +101,24 @@ def test_inflection_pattern_changed(
         print("~" * 40)
         print(f"the following patterns have changes and will be generated\n{pattern_changed}")
 
+    return pattern_changed
+
+
+def export_inflection_patterns(pattern_store: patterns.PatternStore, pattern_changed: List[str]) -> None:
+    """ Write changed patterns to CSV files for humans to diff and save the
+    compiled patterns
+    """
+    print(f"{timeis()} [green]exporting changed inflection patterns")
+
+    create_directories()
+
+    for inflection_name in pattern_changed:
+        csv_path = settings.PATTERNS_DIR / f"{inflection_name}.csv"
+        pattern_store.patterns[inflection_name].to_frame().to_csv(csv_path, sep="\t")
+
+    if pattern_store.compiled:
+        pattern_store.save(settings.PATTERNS_STORE_FILE)
+
 
 def create_data_frame(path: PathType) -> Tuple[pandas.DataFrame, List[str]]:
     print("~" * 40)
@@ -166,6 +132,32 @@ def create_data_frame(path: PathType) -> Tuple[pandas.DataFrame, List[str]]:
     return dps_df, headwords_list
 
 
+def data_file(kind: Kind, class_file_name: str = "1") -> Path:
+    """ Get CSV file of headwords of the kind
+    """
+    if kind is Kind.DPS:
+        return settings.DPS_DIR/"spreadsheets"/"dps-full.csv"
+    return settings.DPS_DIR/"word-frequency"/"csv-for-examples"/f"{class_file_name}-class.csv"
+
+
+def combine_data_frames(frames: List[pandas.DataFrame]) -> Tuple[pandas.DataFrame, List[str]]:
+    """ Combine data of several kinds for shared stages, a headword is taken
+    from the first frame which has it
+    """
+    dps_df = frames[0]
+    for frame in frames[1:]:
+        dps_df = pandas.concat([dps_df, frame[~frame['pali_1'].isin(dps_df['pali_1'])]], ignore_index=True)
+    dps_df = dps_df.fillna("")
+
+    return dps_df, dps_df['pali_1'].tolist()
+
+
+def html_tables_dir(kind: Kind) -> Path:
+    if kind is Kind.DPS:
+        return settings.HTML_TABLES_DPS_DIR
+    return settings.HTML_TABLES_SBS_DIR
+
+
 def test_for_missing_stem_and_pattern(dps_df: pandas.DataFrame):
     print("~" * 40)
     print("test for missing stems and patterns:")
@@ -232,42 +224,40 @@ def test_for_wrong_patterns(inflection_table_index: pandas.DataFrame, dps_df: pa
         print("no wrong patterns found")
 
 
-def test_for_differences_in_stem_and_pattern(dps_df: pandas.DataFrame) -> None:
+def test_for_differences_in_stem_and_pattern(
+        dps_df: pandas.DataFrame, plan: WorkPlan, pattern_changed: List[str],
+        kinds_data: Optional[Dict[Kind, pandas.DataFrame]] = None) -> ChangeManifest:
+    """ Plan artifacts of changed headwords, shared artifacts are compared
+    with the combined data and HTML tables of every kind with its own data,
+    only shared artifacts are compared without data of kinds
+    """
     print("~" * 40)
     print("testing for changes in stem and pattern:")
 
-    create_directories()
+    change_manifest = ChangeManifest.load()
+
+    # Artifacts are fingerprinted with all columns they depend on
+    likes = {name: pattern.like for name, pattern in patterns.registry().items()}
+    artifacts_data = {artifact: dps_df for artifact in manifest.SHARED_ARTIFACTS}
+    artifacts_data.update((manifest.HTML_TABLES[kind], data) for kind, data in (kinds_data or {}).items())
 
-    global changed
-    changed = []
     added_string = ""
     changed_string = ""
 
-    for row in range(dps_df.shape[0]):
-        headword = dps_df.loc[row, 'pali_1']
-        stem = dps_df.loc[row, "stem"]
-        pattern = dps_df.loc[row, "pattern"]
-        old = ""
-        new = f"{headword} {stem} {pattern}"
-
-        try:
-            with open(f"output/pickle test/{headword}", "rb") as pickle_file:
-                old = pickle.load(pickle_file)
-        except FileNotFoundError:
-            added_string += headword + "|"
-            changed.append(headword)
-            with open(f"output/pickle test/{headword}", "wb") as pickle_file:
-                pickle.dump(new,pickle_file)
-            continue
+    for artifact, data in artifacts_data.items():
+        fingerprint_df = data.assign(like=data["pattern"].map(likes).fillna(""))
+        fingerprints = manifest.fingerprint(fingerprint_df, manifest.ARTIFACT_COLUMNS[artifact])
+        diff = change_manifest.diff(artifact, fingerprints)
+        plan.add(artifact, diff.index[diff["added"]], planner.ADDED)
+        plan.add(artifact, diff.index[diff["changed"]], planner.CHANGED)
 
-        if old == new or old in changed:
-            continue
+        # Manifest is written only at the end of the run
+        change_manifest.update(artifact, fingerprints)
 
-        changed_string += headword + "|"
-        changed.append(headword)
-        pickle_file = open(f"output/pickle test/{headword}", "wb")
-        pickle.dump(new, pickle_file)
-        pickle_file.close()
+        if artifact == manifest.INFLECTIONS:
+            change_manifest.sync_pattern_index(dps_df, diff)
+            added_string = "|".join(diff.index[diff["added"]])
+            changed_string = "|".join(diff.index[diff["changed"]])
 
     if added_string != "":
         print("headword / stem / pattern doesnt exist and will be added:")
@@ -277,96 +267,152 @@ def test_for_differences_in_stem_and_pattern(dps_df: pandas.DataFrame) -> None:
         print("headword / stem / pattern has changed and will be updated")
         print("~" * 40)
         print(changed_string)
-    if changed == []:
+    if not plan.items(manifest.INFLECTIONS):
         print("no headwords stems or patterns changed")
+    for artifact in plan.stages:
+        if artifact == manifest.INFLECTIONS:
+            continue
+        print(f"{len(plan.items(artifact))} {artifact} changed")
+
+    # Headwords of changed patterns are scheduled with the reverse index
+    pattern_dependents = change_manifest.pattern_index.dependents(pattern_changed)
+    if pattern_dependents:
+        print(f"{len(pattern_dependents)} headwords depend on changed patterns")
+    plan.add_to_all(pattern_dependents, planner.PATTERN_CHANGED)
 
+    return change_manifest
 
-def _test_if_inflections_exist(dps_df: pandas.DataFrame, output_dir: Path) -> None:
-    global inflections_not_exist
-    inflections_not_exist = []
 
+def explain_pattern(pattern_name: str, dps_df: pandas.DataFrame) -> None:
+    """ Print headwords which depend on the pattern and estimated cost of their
+    rebuild without generating anything
+    """
     print("~" * 40)
-    print("test if inflections exists")
+    print(f"explaining rebuild of pattern {pattern_name}:")
 
-    create_directories()
+    try:
+        pattern_table = patterns.get_pattern(pattern_name)
+    except KeyError:
+        print(f"{timeis()} [red]pattern '{pattern_name}' not found")
+        return
 
-    for row in range(dps_df.shape[0]):
-        headword = dps_df.loc[row, 'pali_1']
-        path = output_dir / headword
-        if not path.is_file():
-            inflections_not_exist.append(headword)
+    change_manifest = ChangeManifest.load()
+    fingerprints = manifest.fingerprint(dps_df, manifest.ARTIFACT_COLUMNS[manifest.INFLECTIONS])
+    change_manifest.sync_pattern_index(dps_df, change_manifest.diff(manifest.INFLECTIONS, fingerprints))
+
+    headwords = sorted(change_manifest.pattern_index.headwords(pattern_name))
+    forms_per_headword = engine.suffix_vector(pattern_table).suffixes.size
+
+    print(f"{len(headwords)} headwords would be rebuilt:")
+    print("|".join(headwords))
+    print("~" * 40)
+    print("estimated cost:")
+    print(f"{len(headwords) * forms_per_headword} inflected forms to generate and transliterate")
+    print(f"{len(headwords)} html tables to render")
+    # Inflections in table (pickle and text) and html table, inflections and
+    # inflections translit are rows of the store
+    print(f"{len(headwords) * 3} files to write at most")
+
+
+@functools.lru_cache(maxsize=None)
+def open_inflection_store() -> InflectionStore:
+    """ Open the store shared by all stages, a new store is filled with
+    per-headword pickles of previous versions
+    """
+    inflection_store = InflectionStore(settings.INFLECTIONS_STORE_FILE)
+
+    if inflection_store.created:
+        for collection in store.COLLECTIONS:
+            legacy_dir = legacy_inflections_dir(collection)
+            imported = inflection_store.import_legacy_dir(collection, legacy_dir)
+            if imported:
+                print(f"{timeis()} {imported} headwords imported from {legacy_dir}")
+
+    return inflection_store
+
+
+def legacy_inflections_dir(collection: str) -> Path:
+    if collection == store.INFLECTIONS:
+        return settings.INFLECTIONS_DIR
+    return settings.INFLECTIONS_TRANSLIT_DIR
+
+
+def stored_headwords(collection: str, read_only: bool = False) -> Set[str]:
+    """ Get headwords which have inflections in the store
+
+    :param read_only: Do not create the store or import pickles of previous
+        versions, headwords of the pickles stand for a missing store
+    """
+    if not read_only:
+        return open_inflection_store().headwords(collection)
+    if not settings.INFLECTIONS_STORE_FILE.exists():
+        return store.legacy_headwords(legacy_inflections_dir(collection))
+    with InflectionStore(settings.INFLECTIONS_STORE_FILE, read_only=True) as inflection_store:
+        return inflection_store.headwords(collection)
+
+
+def _test_if_inflections_exist(
+        dps_df: pandas.DataFrame, collection: str, plan: WorkPlan, read_only: bool = False) -> None:
+    print("~" * 40)
+    print("test if inflections exists")
+
+    existing = stored_headwords(collection, read_only)
+    inflections_not_exist = [headword for headword in dps_df['pali_1'] if headword not in existing]
+    plan.add_to_all(inflections_not_exist, planner.MISSING_INFLECTIONS)
 
     if inflections_not_exist:
         print("~"*40)
-        print("inflection file doesn't exist for:")
+        print("inflections don't exist for:")
         print("|".join(inflections_not_exist))
         print("~"*40)
     else:
-        print("no missing inflection files")
+        print("no missing inflections")
 
 
-def test_if_inflections_exist_suttas(dps_df: pandas.DataFrame) -> None:
-    _test_if_inflections_exist(dps_df, settings.INFLECTIONS_DIR)
+def test_if_inflections_exist_suttas(dps_df: pandas.DataFrame, plan: WorkPlan, read_only: bool = False) -> None:
+    _test_if_inflections_exist(dps_df, store.INFLECTIONS, plan, read_only)
 
 
-def test_if_inflections_exist_dps(dps_df: pandas.DataFrame) -> None:
-    _test_if_inflections_exist(dps_df, settings.INFLECTIONS_TRANSLIT_DIR)
+def test_if_inflections_exist_dps(dps_df: pandas.DataFrame, plan: WorkPlan, read_only: bool = False) -> None:
+    _test_if_inflections_exist(dps_df, store.INFLECTIONS_TRANSLIT, plan, read_only)
 
 
-def generate_changed_inflected_forms(dps_df: pandas.DataFrame) -> None:
+def generate_changed_inflected_forms(dps_df: pandas.DataFrame, plan: WorkPlan) -> None:
     print("~" * 40)
     print("generating changed inflected forms:")
 
     global new_inflections_dict
     new_inflections_dict = {}
 
-    for row in range(dps_df.shape[0]):
-        headword = dps_df.loc[row, 'pali_1']
-        headword_clean = re.sub(r" \d*$", "", headword)
-        stem = dps_df.loc[row, "stem"]
-        if re.match("!.+", stem) is not None:  # stem contains "!.+" - must get inflection table but no synonsyms
-            stem = "!"
-        if stem == "*":
-            stem = ""
-        pattern = dps_df.loc[row, "pattern"]
-        pos = dps_df.loc[row, 'pos']
-        # metadata = dps_df.loc[row, "Metadata"]
-        meaning = dps_df.loc[row, "meaning_1"]
-        variant = dps_df.loc[row, "variant"]
-
-        inflections_string = ""
+    dirty_df = dps_df[dps_df['pali_1'].isin(plan.items(manifest.INFLECTIONS).keys())]
 
-        if headword in changed or pattern in pattern_changed or headword in inflections_not_exist:
+    headwords_clean = dirty_df['pali_1'].str.replace(r" \d*$", "", regex=True)
+    stems = dirty_df["stem"]
+    # stem contains "!.+" - must get inflection table but no synonsyms
+    stems = stems.mask(stems.str.match("!.+"), "!")
+    stems = stems.replace("*", "")
 
-            if stem == "-":
-                inflections_string += headword_clean + " "
+    inflections = headwords_clean + " "
 
-            elif stem == "!":
-                inflections_string += headword_clean + " "
+    # Headwords of a pattern are inflected all together, "-" and "!" stems
+    # get the clean headword only
+    inflected_df = dirty_df[~stems.isin(["-", "!"])]
+    for pattern, group_df in inflected_df.groupby("pattern", sort=False):
+        try:
+            pattern_table = patterns.get_pattern(pattern)
+        except KeyError:
+            with open("inflection generator errorlog.txt", "a") as error_log:
+                for headword in group_df['pali_1']:
+                    error_log.write(f"error on: {headword}\n")
+                    print(f"error on: {headword}\n")
+            continue
 
-            else:
-                inflections_string += headword_clean + " "
+        group_inflections = memo.generation.inflections.get_many(
+            ((stem, pattern) for stem in stems[group_df.index]),
+            lambda keys: engine.inflect(pattern_table, [stem for stem, _ in keys]))
+        inflections[group_df.index] += pandas.Series(group_inflections, index=group_df.index, dtype=object)
 
-                try:
-                    df = pandas.read_csv(f"output/patterns/{pattern}.csv", sep="\t", header=None, na_filter=False)
-                    df_rows = df.shape[0]
-                    df_columns = df.shape[1]
-
-                    for rows in range(1, df_rows):
-                        for columns in range(1, df_columns, 2):
-                            line = df.iloc[rows, columns]
-                            line = re.sub(r"(.+)", f"{stem}\\1", line)
-                            search_string = re.compile("\n", re.M)
-                            replace_string = " "
-                            matches = re.sub(search_string, replace_string, line)
-                            inflections_string += matches + " "
-                except:
-                    with open("inflection generator errorlog.txt", "a") as error_log:
-                        error_log.write(f"error on: {headword}\n")
-                        print(f"error on: {headword}\n")
-
-            this_word_inflections = {headword: inflections_string}
-            new_inflections_dict.update(this_word_inflections)
+    new_inflections_dict = dict(zip(dirty_df['pali_1'], inflections))
 
     if new_inflections_dict:
         new_inflections_df = pandas.DataFrame.from_dict(new_inflections_dict, orient='index')
@@ -376,22 +422,39 @@ def generate_changed_inflected_forms(dps_df: pandas.DataFrame) -> None:
         print("no new inflections")
 
 
+# Rows of HTML tables rendered by a worker process at once, number of
+# threads which write files and files waiting for them at most
+HTML_CHUNK_SIZE = 200
+HTML_WRITER_THREADS = 4
+HTML_WRITES_IN_FLIGHT = 1000
+
+
 class InflectionTableGenerator:
     # TODO Split to module
+    # Stand-in for the stem in compiled tables, a private use character which
+    # never occurs in patterns, labels or translations
+    stem_placeholder = "\ue001"
+
     indeclinables = {"abbrev", "abs", "ger", "ind", "inf", "prefix"}
     conjugations = {"aor", "cond", "fut", "imp", "imperf", "opt", "perf", "pr"}
     declensions = {
         "adj", "card", "cs", "fem", "letter", "masc", "nt", "ordin",
         "pp", "pron", "prp", "ptp", "root", "suffix", "ve"}
 
-    def __init__(self, data: pandas.DataFrame, inflection_table_index: pandas.DataFrame, kind: Kind) -> None:
+    def __init__(
+            self, data: pandas.DataFrame, inflection_table_index: pandas.DataFrame, kind: Kind,
+            translator: Optional[AbbreviationTranslator] = None) -> None:
+        """
+        :param translator: Translator of labels shared by generators, a new
+            one is made by default
+        """
         self._data = data
         self._inflection_table_index_dict = dict(
             zip(
                 inflection_table_index.iloc[:, 0],
                 inflection_table_index.iloc[:, 2]))
         self._kind = kind
-        self._translator = AbbreviationTranslator(script='cyrl')
+        self._translator = translator if translator is not None else AbbreviationTranslator(script='cyrl')
 
     def translate_table(self, data: pandas.DataFrame) -> None:
         if self._kind is Kind.DPS:
@@ -432,10 +495,48 @@ class InflectionTableGenerator:
         heading = f'<p class="heading">{par_content}</p>\n'
         return heading
 
-    def _create_html_table(self, row: int):
-        headword = self._data.loc[row, 'pali_1']
-        print(f"{row}\t{headword}")
+    def _make_table(self, stem: str, pattern: str) -> str:
+        df = patterns.get_pattern(pattern).to_table()
+
+        df_rows = df.shape[0]
+        df_columns = df.shape[1]
+
+        for rows in range(0, df_rows):
+            for columns in range(0, df_columns, 2):  # 1 to 0
+                html_cell = df.iloc[rows, columns]
+                syn_cell = df.iloc[rows, columns]
 
+                html_cell = re.sub(r"(.+)", "<b>\\1</b>", html_cell)  # add bold
+                html_cell = re.sub(r"(.+)", f"{stem}\\1", html_cell)  # add stem
+                html_cell = re.sub(r"\n", "<br>", html_cell)  # add line breaks
+                df.iloc[rows, columns] = html_cell
+
+                syn_cell = re.sub(r"(.+)", f"{stem}\\1", syn_cell)
+                # FIXME following seems unused
+                # search_string = re.compile("\n", re.M)
+                # replace_string = " "
+                # matches = re.sub(search_string, replace_string, syn_cell)
+
+        column_list = []
+        for i in range(1, df_columns, 2):
+            column_list.append(i)
+
+        df.drop(df.columns[column_list], axis=1, inplace=True)
+        self.translate_table(df)
+        table = df.to_html(escape=False)
+        table = re.sub("Unnamed.+", "", table)
+        table = re.sub("NaN", "", table)
+
+        return table
+
+    def _compile_table(self, pattern: str) -> List[str]:
+        """ Make table of the pattern split on the stem placeholder, the
+        table of a stem is the parts joined with the stem
+        """
+        return self._make_table(self.stem_placeholder, pattern).split(self.stem_placeholder)
+
+    def _render_html(self, row: int) -> str:
+        headword = self._data.loc[row, 'pali_1']
         headword_clean = re.sub(r" \d*$", "", headword)
 
         stem = self._data.loc[row, "stem"]
@@ -456,67 +557,163 @@ class InflectionTableGenerator:
             html = f"<p>click on <b>{pattern}</b> for inflection table</p>"
 
         else:
-            df = pandas.read_csv(f"output/patterns/{pattern}.csv", sep="\t", index_col=0, na_filter=False)
-            df.rename_axis(None, inplace=True)  # delete pattern name
-
-            df_rows = df.shape[0]
-            df_columns = df.shape[1]
-
-            for rows in range(0, df_rows):
-                for columns in range(0, df_columns, 2):  # 1 to 0
-                    html_cell = df.iloc[rows, columns]
-                    syn_cell = df.iloc[rows, columns]
-
-                    html_cell = re.sub(r"(.+)", "<b>\\1</b>", html_cell)  # add bold
-                    html_cell = re.sub(r"(.+)", f"{stem}\\1", html_cell)  # add stem
-                    html_cell = re.sub(r"\n", "<br>", html_cell)  # add line breaks
-                    df.iloc[rows, columns] = html_cell
-
-                    syn_cell = re.sub(r"(.+)", f"{stem}\\1", syn_cell)
-                    # FIXME following seems unused
-                    # search_string = re.compile("\n", re.M)
-                    # replace_string = " "
-                    # matches = re.sub(search_string, replace_string, syn_cell)
-
-            column_list = []
-            for i in range(1, df_columns, 2):
-                column_list.append(i)
-
-            df.drop(df.columns[column_list], axis=1, inplace=True)
-            self.translate_table(df)
-            table = df.to_html(escape=False)
-            table = re.sub("Unnamed.+", "", table)
-            table = re.sub("NaN", "", table)
+            table_parts = memo.generation.html.get(
+                (pattern, self._kind),
+                lambda: self._compile_table(pattern))
+            table = stem.join(table_parts)
 
             example = self._inflection_table_index_dict[pattern]
             heading = self._make_heading(pos, example, headword_clean, pattern)
 
             html = heading + table
 
-        if self._kind is Kind.DPS:
-            tables_dir = settings.HTML_TABLES_DPS_DIR
-        elif self._kind is Kind.SBS:
-            tables_dir = settings.HTML_TABLES_SBS_DIR
+        return html
 
-        with open(tables_dir / f"{headword}.html", "w") as html_file:
+    def _write_html(self, headword: str, html: str) -> None:
+        with open(html_tables_dir(self._kind) / f"{headword}.html", "w") as html_file:
             html_file.write(html)
 
-    def generate_html(self) -> None:
+    def _create_html_table(self, row: int):
+        self._write_html(self._data.loc[row, 'pali_1'], self._render_html(row))
+
+    def _memos(self) -> List[memo.Memo]:
+        return [memo.generation.html, self._translator.memo]
+
+    def _render_chunk(self, rows: List[int]) -> Tuple[List[Tuple[str, str]], List[Tuple[int, int]]]:
+        """ Render tables of rows in a worker
+
+        :return: Headwords with their HTML, hits and misses of the worker
+            memos of compiled tables and translations
+        """
+        counts = [(worker_memo.hits, worker_memo.misses) for worker_memo in self._memos()]
+        rendered = [(self._data.loc[row, 'pali_1'], self._render_html(row)) for row in rows]
+        return rendered, [
+            (worker_memo.hits - hits, worker_memo.misses - misses)
+            for worker_memo, (hits, misses) in zip(self._memos(), counts)]
+
+    def __getstate__(self) -> dict:
+        # Workers get only the columns used for rendering
+        state = dict(self.__dict__)
+        state["_data"] = self._data[['pali_1', 'stem', 'pattern', 'pos']]
+        return state
+
+    def generate_html(self, plan: WorkPlan, jobs: int = 1) -> None:
         create_directories()
 
         print("~" * 40)
         print("generating html inflection tables")
         print("~" * 40)
 
-        for row in range(self._data.shape[0]):
-            headword = self._data.loc[row, 'pali_1']
-            pattern = self._data.loc[row, "pattern"]
+        # The last row of a repeated headword wins as its file is written last
+        rows_by_headword = {
+            headword: row for row, headword in enumerate(self._data['pali_1'])
+            if plan.needs(manifest.HTML_TABLES[self._kind], headword)}
+        rows = sorted(rows_by_headword.values())
+        progress = _Progress(len(rows))
 
-            if headword in changed or pattern in pattern_changed or headword in inflections_not_exist:
+        if jobs <= 1 or len(rows) < HTML_CHUNK_SIZE:
+            for row in rows:
                 self._create_html_table(row)
+                progress.advance(1)
+
+        else:
+            self._generate_html_parallel(rows, jobs, progress)
+
+        progress.finish()
+
+    def _generate_html_parallel(self, rows: List[int], jobs: int, progress: "_Progress") -> None:
+        """ Render chunks of rows in `jobs` processes and write files in a
+        bounded pool of threads
+
+        Every process gets the generator with the pattern registry once, at
+        most two chunks per process are in flight.
+        """
+        chunks = [rows[i:i + HTML_CHUNK_SIZE] for i in range(0, len(rows), HTML_CHUNK_SIZE)]
+
+        with ProcessPoolExecutor(
+                max_workers=jobs, initializer=_init_html_worker,
+                initargs=(self, patterns.registry())) as renderers, \
+                ThreadPoolExecutor(max_workers=HTML_WRITER_THREADS) as writers:
+            rendering: Deque[Future] = collections.deque()
+            writing: Deque[Future] = collections.deque()
+
+            def write_first() -> None:
+                rendered, counts = rendering.popleft().result()
+                for run_memo, (hits, misses) in zip(self._memos(), counts):
+                    run_memo.hits += hits
+                    run_memo.misses += misses
+                for headword, html in rendered:
+                    writing.append(writers.submit(self._write_html, headword, html))
+                    while len(writing) > HTML_WRITES_IN_FLIGHT:
+                        writing.popleft().result()
+                progress.advance(len(rendered))
+
+            for chunk in chunks:
+                rendering.append(renderers.submit(_render_html_chunk, chunk))
+                if len(rendering) > 2 * jobs:
+                    write_first()
+
+            while rendering:
+                write_first()
 
+            while writing:
+                writing.popleft().result()
 
-def generate_inflections_in_table_list(dps_df: pandas.DataFrame) -> None:
+
+# Generator of a worker process
+_html_worker: Optional[InflectionTableGenerator] = None
+
+
+def _init_html_worker(generator: InflectionTableGenerator, pattern_registry: Dict[str, patterns.Pattern]) -> None:
+    global _html_worker
+    _html_worker = generator
+    patterns.register_patterns(pattern_registry)
+
+
+def _render_html_chunk(rows: List[int]) -> Tuple[List[Tuple[str, str]], List[Tuple[int, int]]]:
+    return _html_worker._render_chunk(rows)
+
+
+class _Progress:
+    """ Counter of done items printed every `step` items
+    """
+
+    step = 1000
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+
+    def advance(self, count: int) -> None:
+        before = self.done // self.step
+        self.done += count
+        if self.done // self.step > before:
+            print(f"{timeis()} {self.done}/{self.total}")
+
+    def finish(self) -> None:
+        print(f"{timeis()} {self.done}/{self.total} done")
+
+
+def _make_inflections_in_table_list(stem: str, pattern_table: patterns.Pattern) -> List[str]:
+    inflection_string = ""
+
+    for row_cells in pattern_table.cells:
+        for cell in row_cells:
+            if cell == "":
+                continue
+            cell = re.sub(r"(.+)", f"{stem}\\1", cell)
+            search_string = re.compile("\n", re.M)
+            replace_string = " "
+            cell = re.sub(search_string, replace_string, cell)
+            inflection_string += cell + " "
+
+    inflection_string = re.sub("!", "", inflection_string)
+    inflection_string = re.sub(r"\*", "", inflection_string)
+
+    return list(set(inflection_string.split(" ")))
+
+
+def generate_inflections_in_table_list(dps_df: pandas.DataFrame, plan: WorkPlan) -> None:
     print(f"{timeis()} [green]generating inflection lists")
 
     create_directories()
@@ -527,79 +724,54 @@ def generate_inflections_in_table_list(dps_df: pandas.DataFrame) -> None:
 
     dps_df_length = dps_df.shape[0]
 
-    for row in range(dps_df_length):
-        headword = dps_df.loc[row, 'pali_1']
-        headword_clean = re.sub(r" \d*$", "", headword)
-        stem = dps_df.loc[row, "stem"]
-
-        inflection_string = ""
+    for row, headword in enumerate(dps_df['pali_1']):
+        if not plan.needs(manifest.TABLE_LISTS, headword):
+            continue
 
+        stem = dps_df.loc[row, "stem"]
         pattern = dps_df.loc[row, "pattern"]
         pos = dps_df.loc[row, 'pos']
-        meaning = dps_df.loc[row, "meaning_1"]
 
-        if headword in changed or pattern in pattern_changed or headword in inflections_not_exist:
-            if pos not in indeclinables and pos != "idiom" and pos != "sandhi":
-                if row % 1000 == 0:
-                    print(f"{timeis()} {row}/{dps_df_length}\t{headword}")
+        if pos in indeclinables or pos == "idiom" or pos == "sandhi":
+            continue
 
-                try:
-                    df = pandas.read_csv(f"output/patterns/{pattern}.csv", sep="\t", index_col=0, na_filter=False)
-                    df.rename_axis(None, inplace=True)  # delete pattern name
-                    df_rows = df.shape[0]
-                    df_columns = df.shape[1]
-                except:
-                    print(f"{timeis()} [red]pattern '{pattern}' not found for headword '{headword}'")
-                    continue
-
-                for rows in range(0, df_rows):
-                    for columns in range(0, df_columns, 2):  # 1 to 0
-                        cell = df.iloc[rows, columns]
-                        if cell == "":
-                            continue
-                        cell = re.sub(r"(.+)", f"{stem}\\1", cell)
-                        search_string = re.compile("\n", re.M)
-                        replace_string = " "
-                        cell = re.sub(search_string, replace_string, cell)
-                        inflection_string += cell + " "
-
-                inflection_string = re.sub("!", "", inflection_string)
-                inflection_string = re.sub(r"\*", "", inflection_string)
-
-                inflections_list = list(set(inflection_string.split(" ")))
-                with open(f"output/inflections in table/{headword}", "wb") as file:
-                    pickle.dump(inflections_list, file)
-
-                with open(f"output/inflections in table/{headword}.txt", "w") as file:
-                    file.write(str(inflections_list))
-
-
-def transcribe_new_inflections():
-    create_directories()
-    if new_inflections_dict:
-        print("~" * 40)
+        if row % 1000 == 0:
+            print(f"{timeis()} {row}/{dps_df_length}\t{headword}")
+
+        try:
+            pattern_table = patterns.get_pattern(pattern)
+        except KeyError:
+            print(f"{timeis()} [red]pattern '{pattern}' not found for headword '{headword}'")
+            continue
 
-        new_inflections = open(settings.NEW_INFLECTIONS_FILE, "r")
-        new_inflections_read = new_inflections.read()
-        new_inflections.close()
+        inflections_list = memo.generation.table_lists.get(
+            (stem, pattern),
+            lambda: _make_inflections_in_table_list(stem, pattern_table))
+        with open(f"output/inflections in table/{headword}", "wb") as file:
+            pickle.dump(inflections_list, file)
 
-        new_inflections_translit = open(settings.NEW_INFLECTIONS_TRANSLIT_FILE, "w")
+        with open(f"output/inflections in table/{headword}.txt", "w") as file:
+            file.write(str(inflections_list))
 
-        print("converting synonyms to RussianCyrillic")
-        cyrillic = transliterate.process("IAST", "RussianCyrillic", new_inflections_read, post_options=['CyrillicPali'])
 
-        print("converting inflections to devanagari")
-        devanagari = transliterate.process(
-            "IAST", "Devanagari", new_inflections_read, post_options=['DevanagariAnusvara'])
+def transcribe_new_inflections(translit_engine: str = translit.NATIVE, jobs: int = 1):
+    create_directories()
+    if new_inflections_dict:
+        print("~" * 40)
+        print(f"transliterating new inflections with {translit_engine} engine in {jobs} processes")
 
-        roman = new_inflections_read.split("\n")[:-1]
-        cyrillic = cyrillic.split("\n")
-        devanagari = devanagari.split("\n")
+        # Only tokens missing in the cache are passed to the engine, lines
+        # are streamed by chunks
+        token_cache = translit.TokenCache.load(settings.TRANSLIT_CACHE_FILE, translit_engine)
 
-        for i in zip(roman, cyrillic, devanagari):
-            new_inflections_translit.write(i[0]+i[1].split("\t")[1]+i[2].split("\t")[1]+"\n")
+        with open(settings.NEW_INFLECTIONS_FILE, "r") as new_inflections, \
+                open(settings.NEW_INFLECTIONS_TRANSLIT_FILE, "w") as new_inflections_translit:
+            roman = (line.rstrip("\n") for line in new_inflections)
+            for line in translit.transliterate_lines(roman, token_cache, jobs):
+                new_inflections_translit.write(line + "\n")
 
-        new_inflections_translit.close()
+        token_cache.save()
+        print(token_cache.summary())
 
     else:
         print("no new inflections to transcribe")
@@ -614,55 +786,33 @@ def _combine_old_and_new_dataframes(
     create_directories()
 
     diff = pandas.DataFrame()
+    inflections_file = InflectionsFile(all_inflections_file)
 
     if new_inflections_dict:
-        all_inflections = data_frame_from_inflections_csv(all_inflections_file)
-
-        new_inflections = pandas.read_csv(new_inflections_file, header=None, sep="\t")
-
-        diff = pandas.merge(all_inflections, new_inflections, on=[0], how='outer', indicator='exists')
-
-        # Copy changed items
-        test1 = diff["exists"] == "both"
-        test2 = diff["1_y"] != ""
-        filter = test1 & test2
-        diff.loc[filter, "1_x"] = diff.loc[filter, "1_y"]
-
-        # Add new items
-        test1 = diff["exists"] == "right_only"
-        test2 = diff["1_y"] != ""
-        filter = test1 & test2
-        diff.loc[filter, "1_x"] = diff.loc[filter, "1_y"]
-
-        # FIXME !!! How to delete non existent?
-
-        # Order columns
-        diff = diff[[0, "1_x"]]
-
-        diff.to_csv(all_inflections_file, sep="\t", index=None, header=False)
-        print(f"{all_inflections_file} updated")
+        # Only new rows are appended to the log, deleted headwords are logged
+        # by delete_unused_inflections
+        diff = pandas.read_csv(new_inflections_file, header=None, sep="\t", dtype=str, keep_default_na=False)
+        logged = inflections_file.append(upserts=zip(diff[0], diff[1]))
+        print(f"{logged} changes logged to {inflections_file.log_path}")
 
     else:
         print(f"{all_inflections_file} unchanged")
 
+    if inflections_file.needs_compaction:
+        inflections_file.compact()
+        print(f"{all_inflections_file} compacted")
+
     return diff
 
 
-def _export_to_pickle(output_dir: Path, diff: pandas.DataFrame, alt_anusvara=False):
+def _export_to_store(collection: str, diff: pandas.DataFrame, alt_anusvara=False):
     print("~" * 40)
-    print(f"exporting pickles to {output_dir}")
-
-    create_directories()
-
-    all_inflections = diff
-
-    for row in range(len(all_inflections)):
-        headword = all_inflections.iloc[row, 0]
-        inflections = all_inflections.iloc[row, 1]
+    print(f"exporting {collection} to {settings.INFLECTIONS_STORE_FILE}")
 
-        # FIXME !!! How to delete headword when no longer exists???
+    items = []
 
-        if headword in new_inflections_dict.keys():
+    for headword, inflections in diff.itertuples(index=False, name=None):
+        if headword in new_inflections_dict:
             print(headword)
 
             inflections_list = inflections.split()
@@ -673,9 +823,9 @@ def _export_to_pickle(output_dir: Path, diff: pandas.DataFrame, alt_anusvara=Fal
                 inflections_list.extend(alt_list)
 
             inflections_list = list(dict.fromkeys(inflections_list))
+            items.append((headword, inflections_list))
 
-            with open(output_dir / headword, "wb") as text_file:
-                pickle.dump(inflections_list, text_file)
+    open_inflection_store().upsert(collection, items)
 
 
 def combine_old_and_new_translit_dataframes() -> pandas.DataFrame:
@@ -685,8 +835,8 @@ def combine_old_and_new_translit_dataframes() -> pandas.DataFrame:
         diff_file="output/diff translit.csv")
 
 
-def export_translit_to_pickle(diff: pandas.DataFrame) -> None:
-    _export_to_pickle(settings.INFLECTIONS_TRANSLIT_DIR, diff, alt_anusvara=True)
+def export_translit_to_store(diff: pandas.DataFrame) -> None:
+    _export_to_store(store.INFLECTIONS_TRANSLIT, diff, alt_anusvara=True)
 
 
 def combine_old_and_new_dataframes() -> pandas.DataFrame:
@@ -696,8 +846,144 @@ def combine_old_and_new_dataframes() -> pandas.DataFrame:
         diff_file="output/diff.csv")
 
 
-def export_inflections_to_pickle(diff: pandas.DataFrame) -> None:
-    _export_to_pickle(settings.INFLECTIONS_DIR, diff)
+def export_inflections_to_store(diff: pandas.DataFrame) -> None:
+    _export_to_store(store.INFLECTIONS, diff)
+
+
+def update_form_index(headwords: List[str]) -> None:
+    """ Put new inflections to the overlay of the form index, rebuild the
+    index from all inflections if it is missing or the overlay grew too large
+    """
+    print("~" * 40)
+    print("updating form index")
+
+    index = form_index.FormIndex.open(settings.FORM_INDEX_FILE)
+
+    if index is not None:
+        removed = index.headwords().difference(headwords)
+        index.update(
+            ((headword, inflections.split()) for headword, inflections in new_inflections_dict.items()),
+            removed)
+        needs_compaction = index.needs_compaction
+        print(f"{len(new_inflections_dict)} changed, {len(removed)} removed, {len(index.overlay)} in overlay")
+        index.close()
+        if not needs_compaction:
+            return
+
+    print(f"building {settings.FORM_INDEX_FILE}")
+
+    all_inflections = InflectionsFile(settings.ALL_INFLECTIONS_FILE).read()
+    all_inflections = all_inflections[all_inflections[0].isin(headwords)]
+    form_index.build(
+        settings.FORM_INDEX_FILE,
+        zip(all_inflections[0], all_inflections[1].fillna("").str.split()))
+
+
+def export_legacy_pickles() -> None:
+    """ Write per-headword pickles of inflections and inflections translit
+    as previous versions did
+    """
+    print(f"{timeis()} [green]exporting legacy pickles")
+
+    inflection_store = open_inflection_store()
+    for collection in store.COLLECTIONS:
+        legacy_dir = legacy_inflections_dir(collection)
+        for headword in inflection_store.export_legacy_dir(collection, legacy_dir, new_inflections_dict):
+            print(f"{timeis()} {headword}")
+
+
+def no_meaning_filter(dps_df: pandas.DataFrame) -> pandas.Series:
+    test1 = dps_df["meaning_1"] != ""
+    test2 = dps_df['pos'] != "prefix"
+    test3 = dps_df['pos'] != "suffix"
+    test4 = dps_df['pos'] != "cs"
+    test5 = dps_df['pos'] != "ve"
+    test6 = dps_df['pos'] != "idiom"
+    # test7 = dps_df["Metadata"] != "yes"
+    return test1 & test2 & test3 & test4 & test5 & test6
+
+
+def no_eg1_filter(dps_df: pandas.DataFrame) -> pandas.Series:
+    test1 = dps_df["sutta_1"] == ""
+    test2 = dps_df["sbs_chapter_2"] != ""
+    test3 = dps_df["sutta_2"] == ""
+    test4 = dps_df['pos'] != "prefix"
+    return test1 & test2 & test3 & test4
+
+
+def no_eg2_filter(dps_df: pandas.DataFrame) -> pandas.Series:
+    return ~dps_df["Fin"].str.contains("s")
+
+
+def no_eg3_filter(dps_df: pandas.DataFrame) -> pandas.Series:
+    # test2 = dps_df["sbs_chapter_2"] != ""
+    return dps_df['pos'] == "prefix"
+
+
+def only_in_class_filter(dps_df: pandas.DataFrame) -> pandas.Series:
+    # test2 = dps_df["ru_meaning"] != ""
+    # test3 = dps_df["sutta_2"] == ""
+    # test4 = dps_df['pos'] != "prefix"
+    return dps_df['sbs_class_anki'] == "-"
+
+
+def already_in_filter(dps_df: pandas.DataFrame) -> pandas.Series:
+    test1 = dps_df['sbs_class_anki'] != "-"
+    test2 = dps_df['sbs_class_anki'] != ""
+    return test1 & test2
+
+
+def potential_filter(dps_df: pandas.DataFrame, class_file_name: str) -> pandas.Series:
+    test1 = dps_df["meaning_1"] != ""
+    test2 = dps_df['sbs_class_anki'] == ""
+    test3 = dps_df["class"] == f"{class_file_name}"
+    return test1 & test2 & test3
+
+
+class WordCategories(NamedTuple):
+    """ Inflections which words of suttas are compared with, every set but
+    `inflections` has inflections of headwords selected by a filter
+    """
+    inflections: Set[str]
+    meaning: Set[str]
+    eg1: Set[str]
+    eg2: Set[str]
+    eg3: Set[str]
+
+
+def inflections_of_headwords(all_inflections: pandas.DataFrame, headwords: Iterable[str]) -> Set[str]:
+    selected = all_inflections[all_inflections[0].isin(set(headwords))]
+    return set(" ".join(selected[1]).split())
+
+
+def read_inflections() -> Set[str]:
+    """ Get all generated inflections of all headwords
+    """
+    all_inflections = InflectionsFile(settings.ALL_INFLECTIONS_FILE).read()
+    return set(" ".join(all_inflections[1]).split())
+
+
+def make_word_categories(dps_df: pandas.DataFrame, kind: Kind = Kind.DPS, class_file_name: str = "1") -> WordCategories:
+    """ Make all sets of inflections for comparison of suttas at once, same
+    as lists of `make_list_of_all_inflections` and others for the kind
+    """
+    print(f"{timeis()} [green]making word categories")
+
+    all_inflections = InflectionsFile(settings.ALL_INFLECTIONS_FILE).read()
+
+    if kind is Kind.DPS:
+        filters = [no_meaning_filter(dps_df), no_eg1_filter(dps_df), no_eg2_filter(dps_df), no_eg3_filter(dps_df)]
+    else:
+        filters = [
+            no_meaning_filter(dps_df), only_in_class_filter(dps_df), already_in_filter(dps_df),
+            potential_filter(dps_df, class_file_name)]
+
+    categories = WordCategories(
+        set(" ".join(all_inflections[1]).split()),
+        *(inflections_of_headwords(all_inflections, dps_df[test]['pali_1']) for test in filters))
+
+    print(f"{timeis()} {len(categories.inflections)} inflections")
+    return categories
 
 
 def make_list_of_all_inflections() -> None:
@@ -705,7 +991,7 @@ def make_list_of_all_inflections() -> None:
     print("creating all inflections df")
 
     global all_inflections_df
-    all_inflections_df = pandas.read_csv(settings.ALL_INFLECTIONS_FILE, header=None, sep="\t")
+    all_inflections_df = InflectionsFile(settings.ALL_INFLECTIONS_FILE).read()
 
     print("~" * 40)
     print("making master list of all inflections")
@@ -737,16 +1023,7 @@ def make_list_of_all_inflections_no_meaning(dps_df: pandas.DataFrame) -> None:
 
     global no_meaning_list
 
-    test1 = dps_df["meaning_1"] != ""
-    test2 = dps_df['pos'] != "prefix"
-    test3 = dps_df['pos'] != "suffix"
-    test4 = dps_df['pos'] != "cs"
-    test5 = dps_df['pos'] != "ve"
-    test6 = dps_df['pos'] != "idiom"
-    # test7 = dps_df["Metadata"] != "yes"
-    filter = test1 & test2 & test3 & test4 & test5 & test6
-
-    no_meaning_df = dps_df[filter]
+    no_meaning_df = dps_df[no_meaning_filter(dps_df)]
 
     no_meaning_headword_list = no_meaning_df['pali_1'].tolist()
 
@@ -776,12 +1053,7 @@ def make_list_of_all_inflections_no_eg1(dps_df: pandas.DataFrame) -> None:
 
     global no_eg1_list
 
-    test1 = dps_df["sutta_1"] == ""
-    test2 = dps_df["sbs_chapter_2"] != ""
-    test3 = dps_df["sutta_2"] == ""
-    test4 = dps_df['pos'] != "prefix"
-    filter = test1 & test2 & test3 & test4
-    no_eg1_df = dps_df[filter]
+    no_eg1_df = dps_df[no_eg1_filter(dps_df)]
 
     no_eg1_headword_list = no_eg1_df['pali_1'].tolist()
 
@@ -810,12 +1082,7 @@ def make_list_of_all_inflections_only_in_class(dps_df: pandas.DataFrame) -> None
 
     global no_eg1_list
 
-    test1 = dps_df['sbs_class_anki'] == "-"
-    # test2 = dps_df["ru_meaning"] != ""
-    # test3 = dps_df["sutta_2"] == ""
-    # test4 = dps_df['pos'] != "prefix"
-    filter = test1
-    no_eg1_df = dps_df[filter]
+    no_eg1_df = dps_df[only_in_class_filter(dps_df)]
 
     no_eg1_headword_list = no_eg1_df['pali_1'].tolist()
 
@@ -853,13 +1120,7 @@ def make_list_of_all_inflections_already_in(dps_df: pandas.DataFrame) -> None:
     # if class_file_name == '4':
     #   cl_active = "1|2|3|4"
 
-    test1 = dps_df['sbs_class_anki'] != "-"
-    test2 = dps_df['sbs_class_anki'] != ""
-    # test2 = dps_df["ru_meaning"] != ""
-    # test3 = dps_df["sutta_2"] == ""
-    # test4 = dps_df['pos'] != "prefix"
-    filter = test1 & test2
-    no_eg2_df = dps_df[filter]
+    no_eg2_df = dps_df[already_in_filter(dps_df)]
 
     no_eg2_headword_list = no_eg2_df['pali_1'].tolist()
 
@@ -888,8 +1149,7 @@ def make_list_of_all_inflections_no_eg2(dps_df: pandas.DataFrame) -> None:
 
     global no_eg2_list
 
-    test = ~dps_df["Fin"].str.contains("s")
-    no_eg2_df = dps_df[test]
+    no_eg2_df = dps_df[no_eg2_filter(dps_df)]
 
     no_eg2_headword_list = no_eg2_df['pali_1'].tolist()
 
@@ -918,10 +1178,7 @@ def make_list_of_all_inflections_no_eg3(dps_df: pandas.DataFrame) -> None:
 
     global no_eg3_list
 
-    test1 = dps_df['pos'] == "prefix"
-    # test2 = dps_df["sbs_chapter_2"] != ""
-    filter = test1
-    no_eg3_df = dps_df[filter]
+    no_eg3_df = dps_df[no_eg3_filter(dps_df)]
 
     no_eg3_headword_list = no_eg3_df['pali_1'].tolist()
 
@@ -950,12 +1207,7 @@ def make_list_of_all_inflections_potential(dps_df: pandas.DataFrame, class_file_
 
     global no_eg3_list
 
-    test1 = dps_df["meaning_1"] != ""
-    test2 = dps_df['sbs_class_anki'] == ""
-    test3 = dps_df["class"] == f"{class_file_name}"
-    # test2 = dps_df["sbs_chapter_2"] != ""
-    filter = test1 & test2 & test3
-    no_eg3_df = dps_df[filter]
+    no_eg3_df = dps_df[potential_filter(dps_df, class_file_name)]
 
     no_eg3_headword_list = no_eg3_df['pali_1'].tolist()
 
@@ -977,55 +1229,6 @@ def make_list_of_all_inflections_potential(dps_df: pandas.DataFrame, class_file_
     no_eg3_list = list(dict.fromkeys(no_eg3_list))
 
 
-def clean_machine(text):
-    text = text.lower()
-    text = re.sub(r"\d", "", text)
-    text = re.sub(r"\.", "", text)
-    text = re.sub("/", "", text)
-    text = re.sub(r"\:", "", text)
-    text = re.sub(r"\;", "", text)
-    text = re.sub(",", " ", text)
-    text = re.sub("‘", "", text)
-    text = re.sub("'", "", text)
-    text = re.sub(";", "", text)
-    text = re.sub("’", "", text)
-    text = re.sub(" ̓ ", " ", text)
-    text = re.sub(r"\’", "", text)
-    text = re.sub("\"", "", text)
-    text = re.sub("!", "", text)
-    text = re.sub(r"\?", "", text)
-    text = re.sub(r"\+", "", text)
-    text = re.sub("=", "", text)
-    text = re.sub("﻿", "", text)
-    text = re.sub("⇒", "", text)
-    text = re.sub("§", " ", text)
-    text = re.sub(r"\(", "", text)
-    text = re.sub(r"\)", "", text)
-    text = re.sub("-", "", text)
-    text = re.sub("–", "", text)
-    text = re.sub(r"\—", " ", text)
-    text = re.sub("\t", " ", text)
-    text = re.sub("…", " ", text)
-    text = re.sub("–", "", text)
-    # text = re.sub("\n", " \n ", text)
-    text = re.sub("  ", " ", text)
-    text = re.sub("^ ", "", text)
-    text = re.sub("^ ", "", text)
-    text = re.sub("^ ", "", text)
-    text = re.sub(r"\[", "", text)
-    text = re.sub(r"\]", "", text)
-    text = re.sub("ṁ", "ṃ", text)
-    text = re.sub("〈", "", text)
-    text = re.sub("〉", "", text)
-    text = re.sub(r"\*", "", text)
-    text = re.sub("☸", "", text)
-    # text = re.sub("\n", "  ", text)
-    text = re.sub("suttaṃ", "suttaṃ\n", text)
-    text = re.sub("next", "next\n", text)
-
-    return text
-
-
 def read_and_clean_sutta_text() -> Tuple[str, str]:
     create_directories()
 
@@ -1037,7 +1240,7 @@ def read_and_clean_sutta_text() -> Tuple[str, str]:
     output_path = settings.HTML_SUTTAS_DIR
 
     sutta_dict = pandas.read_csv(
-        'sutta corespondence tables/sutta correspondence tables.csv',
+        settings.SUTTA_CORRESPONDENCE_FILE,
         sep="\t",
         index_col=0,
         squeeze=True).to_dict(orient='index',)
@@ -1053,25 +1256,56 @@ def read_and_clean_sutta_text() -> Tuple[str, str]:
     commentary_file = sutta_dict.get(sutta_number).get("aṭṭhakathā")
     sub_commentary_file = sutta_dict.get(sutta_number).get("ṭīkā")
 
-    with open(input_path / sutta_file, 'r') as input_file:
-        sutta_text = input_file.read()
+    # Texts are cleaned line by line, commentaries are large
+    for text_file in [sutta_file, commentary_file]:
+        with open(input_path / text_file, 'r') as input_file, open(output_path / text_file, "w") as output_file:
+            output_file.writelines(normalizer.clean_lines(input_file))
+
+    return sutta_file, commentary_file
 
-    sutta_text = clean_machine(sutta_text)
 
-    with open(output_path / sutta_file, "w") as output_file:
-        output_file.write(sutta_text)
+def read_words(path: PathType) -> List[str]:
+    """ Split a cleaned text to words as the comparison table has them, line
+    breaks are dropped, so the last words of lines are compared and
+    highlighted as any other
+    """
+    with open(path) as text_to_split:
+        return [word for line in text_to_split for word in line.rstrip("\n").split(" ")]
 
-    # Commentaries
 
-    with open(input_path / commentary_file, 'r') as input_file:
-        commentary_text = input_file.read()
+def comparison_table(words: List[str], categories: WordCategories, examples: bool = True) -> pandas.DataFrame:
+    """ Make table of unique words with their categories
 
-    commentary_text = clean_machine(commentary_text)
+    :param examples: Whether to add columns of examples, only suttas have them
+    """
+    words_df = pandas.DataFrame({0: words}, dtype=object)
 
-    with open(output_path / commentary_file, "w") as output_file:
-        output_file.write(commentary_text)
+    words_df["Inflection"] = words_df[0].isin(categories.inflections)
+    words_df["Meaning"] = words_df[0].isin(categories.meaning)
 
-    return sutta_file, commentary_file
+    if examples:
+        words_df["Eg1"] = ~words_df[0].isin(categories.eg1)
+        words_df["Eg2"] = ~words_df[0].isin(categories.eg2)
+        words_df["Eg3"] = ~words_df[0].isin(categories.eg3)
+
+    words_df.rename(columns={0: "Pali"}, inplace=True)
+
+    words_df.drop_duplicates(subset=["Pali"], keep="first", inplace=True)
+
+    return words_df
+
+
+def write_comparison_table(words_df: pandas.DataFrame, path: PathType) -> None:
+    """ Write the comparison table in the Pāli order of words, indexes are
+    positions of words in the text
+
+    The table itself keeps the text order, lists of highlighted words of a
+    sutta follow the text.
+    """
+    pali_words = words_df["Pali"].tolist()
+    sorted_df = words_df.iloc[sort_pali(range(len(pali_words)), key=pali_words.__getitem__)]
+    with open(path, 'w') as txt_file:
+        sorted_df.to_csv(txt_file, header=True, index=True, sep="\t")
 
 
 def make_comparison_table(sutta_file: str, commentary_file: str) -> None:
@@ -1079,56 +1313,70 @@ def make_comparison_table(sutta_file: str, commentary_file: str) -> None:
     print("making sutta comparison table")
 
     output_path = settings.HTML_SUTTAS_DIR
-
-    with open(output_path / sutta_file) as text_to_split:
-        word_llst = [word for line in text_to_split for word in line.split(" ")]
+    categories = WordCategories(
+        all_inflections_set, set(no_meaning_list), set(no_eg1_list), set(no_eg2_list), set(no_eg3_list))
 
     global sutta_words_df
-    sutta_words_df = pandas.DataFrame(word_llst)
+    sutta_words_df = comparison_table(read_words(output_path / sutta_file), categories)
 
-    inflection_test = sutta_words_df[0].isin(all_inflections_set)
-    sutta_words_df["Inflection"] = inflection_test
+    write_comparison_table(sutta_words_df, output_path / f"{sutta_file}.csv")
 
-    no_meaning_test = sutta_words_df[0].isin(no_meaning_list)
-    sutta_words_df["Meaning"] = no_meaning_test
+    print("~" * 40)
+    print("making commentary comparison table")
 
-    eg1_test = sutta_words_df[0].isin(no_eg1_list)
-    sutta_words_df["Eg1"] = ~eg1_test
+    global commentary_words_df
+    commentary_words_df = comparison_table(read_words(output_path / commentary_file), categories, examples=False)
 
-    eg2_test = sutta_words_df[0].isin(no_eg2_list)
-    sutta_words_df["Eg2"] = ~eg2_test
+    write_comparison_table(commentary_words_df, output_path / f"{commentary_file}.csv")
 
-    eg3_test = sutta_words_df[0].isin(no_eg3_list)
-    sutta_words_df["Eg3"] = ~eg3_test
 
-    sutta_words_df.rename(columns={0: "Pali"}, inplace=True)
+# Highlight classes of words by columns of the comparison table, a word gets
+# the class of the first column which is false for it
+HIGHLIGHT_CLASSES = [("Meaning", "highlight"), ("Eg1", "red"), ("Eg2", "green"), ("Eg3", "blue")]
 
-    sutta_words_df.drop_duplicates(subset=["Pali"], keep="first", inplace=True)
+_WHITESPACE_RE = re.compile(r"(\s+)")
 
-    with open(output_path / f"{sutta_file}.csv", 'w') as txt_file:
-        sutta_words_df.to_csv(txt_file, header=True, index=True, sep="\t")
 
-    print("~" * 40)
-    print("making commentary comparison table")
+def highlight_words(text: str, words_df: pandas.DataFrame) -> Tuple[str, Dict[str, List[str]]]:
+    """ Wrap words of the text in spans of their highlight classes in one
+    pass over whitespace separated tokens
 
-    with open(output_path / commentary_file) as text_to_split:
-        word_llst = [word for line in text_to_split for word in line.split(" ")]
+    :return: Highlighted text and words by highlight classes in the order of
+        the table
+    """
+    classes: Dict[str, str] = {}
+    highlighted: Dict[str, List[str]] = {css_class: [] for _, css_class in HIGHLIGHT_CLASSES}
 
-    global commentary_words_df
-    commentary_words_df = pandas.DataFrame(word_llst)
+    columns = ["Pali"] + [column for column, _ in HIGHLIGHT_CLASSES]
+    for pali_word, *exists in words_df[columns].itertuples(index=False, name=None):
+        pali_word = str(pali_word)
+        for (_, css_class), column_exists in zip(HIGHLIGHT_CLASSES, exists):
+            if str(column_exists) == "False":
+                classes.setdefault(pali_word, css_class)
+                highlighted[css_class].append(pali_word)
+                break
 
-    inflection_test = commentary_words_df[0].isin(all_inflections_set)
-    commentary_words_df["Inflection"] = inflection_test
+    tokens = _WHITESPACE_RE.split(text)
+    for index in range(0, len(tokens), 2):
+        css_class = classes.get(tokens[index])
+        if css_class is not None:
+            tokens[index] = f'<span class="{css_class}">{tokens[index]}</span>'
 
-    no_meaning_test = commentary_words_df[0].isin(no_meaning_list)
-    commentary_words_df["Meaning"] = no_meaning_test
+    return "".join(tokens), highlighted
 
-    commentary_words_df.rename(columns={0: "Pali"}, inplace=True)
 
-    commentary_words_df.drop_duplicates(subset=["Pali"], keep="first", inplace=True)
+def highlighted_sutta(text: str, words_df: pandas.DataFrame) -> str:
+    """ Make HTML of a cleaned sutta text with highlighted words followed by
+    lists of words of every highlight class
+    """
+    text, highlighted = highlight_words(text, words_df)
 
-    with open(output_path / f"{commentary_file}.csv", 'w') as txt_file:
-        commentary_words_df.to_csv(txt_file, header=True, index=True, sep="\t")
+    text = text.replace("\n", "<br><br>")
+    text += f'<br><br>no meanings: <span class="highlight">{" ".join(highlighted["highlight"])}</span>'
+    text += f'<br><br>no eg1: <span class="red">{" ".join(highlighted["red"])}</span>'
+    text += f'<br><br>no eg2: <span class="green">{" ".join(highlighted["green"])}</span>'
+    text += f'<br><br>no eg3: <span class="blue">{" ".join(highlighted["blue"])}</span>'
+    return text
 
 
 def html_find_and_replace(sutta_file: str) -> None:
@@ -1139,90 +1387,53 @@ def html_find_and_replace(sutta_file: str) -> None:
     output_path = settings.HTML_SUTTAS_DIR
 
     global sutta_text
-    global commentary_text
-
-    no_meaning = []
-    no_eg1 = []
-    no_eg2 = []
-    no_eg3 = []
 
     with open(output_path / sutta_file, 'r') as input_file:
-        sutta_text = input_file.read()
-
-    max_row = sutta_words_df.shape[0]
-    row = 0
+        sutta_text = highlighted_sutta(input_file.read(), sutta_words_df)
 
-    for word in range(row, max_row):
-        pali_word = str(sutta_words_df.iloc[row, 0])
-        inflection_exists = str(sutta_words_df.iloc[row, 1])
-        meaning_exists = str(sutta_words_df.iloc[row, 2])
-        eg1_exists = str(sutta_words_df.iloc[row, 3])
-        eg2_exists = str(sutta_words_df.iloc[row, 4])
-        eg3_exists = str(sutta_words_df.iloc[row, 5])
 
-        if row % 250 == 0:
-            print(f"{row}/{max_row}\t{pali_word}")
-
-        row += 1
-
-        if meaning_exists == "False":
-            sutta_text = re.sub(fr"(^|\s)({pali_word})(\s|\n|$)", r'\\1<span class="highlight">\\2</span>\\3', sutta_text)
-            no_meaning.append(pali_word)
-
-        elif eg1_exists == "False":
-            sutta_text = re.sub(fr"(^|\s)({pali_word})(\s|\n|$)", r'\\1<span class="red">\\2</span>\\3', sutta_text)
-            no_eg1.append(pali_word)
+def sutta_page(text: str) -> str:
+    html1 = resources.read_text(__package__, 'part1.html')
 
-        elif eg2_exists == "False":
-            sutta_text = re.sub(fr"(^|\s)({pali_word})(\s|\n|$)", r'\\1<span class="green">\\2</span>\\3', sutta_text)
-            no_eg2.append(pali_word)
+    # html2 = """</div><div id="right">"""
 
-        elif eg3_exists == "False":
-            sutta_text = re.sub(fr"(^|\s)({pali_word})(\s|\n|$)", r'\\1<span class="blue">\\2</span>\\3', sutta_text)
-            no_eg3.append(pali_word)
+    html3 = """</div></div>"""
 
-    sutta_text = re.sub("\n", "<br><br>", sutta_text)
-    sutta_text += f'<br><br>no meanings: <span class="highlight">{" ".join(no_meaning)}</span>'
-    sutta_text += f'<br><br>no eg1: <span class="red">{" ".join(no_eg1)}</span>'
-    sutta_text += f'<br><br>no eg2: <span class="green">{" ".join(no_eg2)}</span>'
-    sutta_text += f'<br><br>no eg3: <span class="blue">{" ".join(no_eg3)}</span>'
+    # html2 and commentary_text are not written
+    return html1 + text + html3
 
 
 def write_html(sutta_file: str) -> None:
     create_directories()
 
     output_path = settings.HTML_SUTTAS_DIR
-    html1 = resources.read_text(__package__, 'part1.html')
 
-    # html2 = """</div><div id="right">"""
-
-    html3 = """</div></div>"""
-
-    html_file = open(output_path / f"{sutta_file}.html", "w")
-    html_file = open(output_path / f"{sutta_file}.html", "a")
-    html_file.write(html1)
-    html_file.write(sutta_text)
-    # html_file.write(html2)
-    # html_file.write(commentary_text)
-    html_file.write(html3)
-    html_file.close()
+    with open(output_path / f"{sutta_file}.html", "w") as html_file:
+        html_file.write(sutta_page(sutta_text))
 
 
 def open_in_browser(sutta_file: str) -> None:
     webbrowser.open(f'output/html suttas/{sutta_file}.html')
 
 
-def delete_old_pickle_files(headwords: List[str]):
-    print(f"{timeis()} [green]deleting old pickle files ")
+def save_change_manifest(
+        change_manifest: ChangeManifest, headwords: Optional[List[str]] = None,
+        kinds_headwords: Optional[Dict[Kind, List[str]]] = None) -> None:
+    """ Save manifest, headwords which are not in the list are removed from
+    shared artifacts and ones which are not in headwords of a kind from HTML
+    tables of the kind
+    """
+    print(f"{timeis()} [green]saving change manifest")
 
-    for _root, _dirs, files in os.walk("output/pickle test", topdown=True):
-        for file in files:
-            try:
-                if file not in headwords:
-                    os.remove(f"output/pickle test/{file}")
-                    print(f"{timeis()} {file}")
-            except FileNotFoundError:
-                print(f"{timeis()} [red]{file} not found")
+    removed: Set[str] = set()
+    if headwords is not None:
+        removed |= change_manifest.prune(headwords, manifest.SHARED_ARTIFACTS)
+    for kind, kind_headwords in (kinds_headwords or {}).items():
+        removed |= change_manifest.prune(kind_headwords, [manifest.HTML_TABLES[kind]])
+    for headword in sorted(removed):
+        print(f"{timeis()} {headword}")
+
+    change_manifest.save()
 
 
 def delete_unused_inflection_patterns(inflection_table_index):
@@ -1254,35 +1465,28 @@ def _delete_unused_html_tables(path, headwords: List[str]) -> None:
                     print(f"{timeis()} {file}")
 
 
-def delete_unused_html_tables(headwords):
+def delete_unused_html_tables(kinds_headwords: Dict[Kind, List[str]]) -> None:
+    """ Delete tables of every kind which are not in headwords of the kind,
+    tables of other kinds are kept
+    """
     print(f"{timeis()} [green]deleting unused html files ")
-    for path in [settings.HTML_TABLES_DPS_DIR, settings.HTML_TABLES_SBS_DIR]:
-        _delete_unused_html_tables(path, headwords)
+    for kind, headwords in kinds_headwords.items():
+        _delete_unused_html_tables(html_tables_dir(kind), headwords)
 
 
 def delete_unused_inflections(headwords: List[str]):
     print(f"{timeis()} [green]deleting unused inflections")
 
-    for _root, _dirs, files in os.walk(settings.INFLECTIONS_DIR, topdown=True):
-        for file in files:
-            if file not in headwords:
-                try:
-                    os.remove(settings.INFLECTIONS_DIR / file)
-                except FileNotFoundError:
-                    print(f"{timeis()} [red]{file} not found")
-                else:
-                    print(f"{timeis()} {file}")
+    removed = open_inflection_store().prune(store.INFLECTIONS, headwords)
+    for headword in removed:
+        print(f"{timeis()} {headword}")
+    InflectionsFile(settings.ALL_INFLECTIONS_FILE).append(deletes=removed)
 
 
 def delete_unused_inflections_translit(headwords: List[str]):
     print(f"{timeis()} [green]deleting unused inflections translit")
 
-    for _root, _dirs, files in os.walk(settings.INFLECTIONS_TRANSLIT_DIR, topdown=True):
-        for file in files:
-            if file not in headwords:
-                try:
-                    os.remove(settings.INFLECTIONS_TRANSLIT_DIR / file)
-                except FileNotFoundError:
-                    print(f"{timeis()} [red]{file} not found")
-                else:
-                    print(f"{timeis()} {file}")
+    removed = open_inflection_store().prune(store.INFLECTIONS_TRANSLIT, headwords)
+    for headword in removed:
+        print(f"{timeis()} {headword}")
+    InflectionsFile(settings.ALL_INFLECTIONS_TRANSLIT_FILE).append(deletes=removed)
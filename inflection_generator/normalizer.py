@@ -0,0 +1,73 @@
+""" Normalizer of CSCD texts for comparison of words of suttas and
+commentaries
+
+Rules are applied in the same order as they were by a chain of `re.sub`
+calls. Character rules between multi-character ones are merged to a class
+of deleted and a class of replaced characters, so a text is scanned once
+per group of rules instead of once per character.
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+# Deleted before the rule of the comma above between spaces, digits are any
+# Unicode decimal digits
+_FIRST_DELETED_RE = re.compile(r"[\d./:;‘'’]")
+
+_COMMA_ABOVE = " \u0313 "
+
+# Deleted and replaced with space before spaces are collapsed
+_SECOND_DELETED_RE = re.compile("[\"!?+=\ufeff⇒()\\-–]")
+_SECOND_SPACED_RE = re.compile("[§—\t…]")
+
+# Deleted after spaces are collapsed
+_THIRD_DELETED_RE = re.compile("[\\[\\]〈〉*☸]")
+
+# Suttas and paragraphs end with these words
+_LINE_END_RE = re.compile("(suttaṃ|next)")
+
+# Spaces deleted at the start of the text
+_LEADING_SPACES = 3
+
+# Characters of whole lines cleaned at once
+BLOCK_SIZE = 1 << 16
+
+
+def _clean_block(text: str, first: bool) -> str:
+    text = _FIRST_DELETED_RE.sub("", text.lower()).replace(",", " ")
+    text = text.replace(_COMMA_ABOVE, " ")
+    text = _SECOND_DELETED_RE.sub("", text)
+    text = _SECOND_SPACED_RE.sub(" ", text)
+    text = text.replace("  ", " ")
+    if first:
+        for _ in range(_LEADING_SPACES):
+            if text.startswith(" "):
+                text = text[1:]
+    text = _THIRD_DELETED_RE.sub("", text).replace("ṁ", "ṃ")
+    return _LINE_END_RE.sub("\\1\n", text)
+
+
+def clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    """ Clean lines of a text by blocks of about `BLOCK_SIZE` characters, so
+    a file is cleaned with flat memory
+
+    No rule spans a line break, so blocks of whole lines are cleaned as the
+    whole text would be.
+    """
+    block: List[str] = []
+    size = 0
+    first = True
+
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield _clean_block("".join(block), first)
+            block, size, first = [], 0, False
+
+    if block:
+        yield _clean_block("".join(block), first)
+
+
+def clean_machine(text: str) -> str:
+    return "".join(clean_lines(text.splitlines(keepends=True)))
@@ -0,0 +1,245 @@
+import hashlib
+import pickle
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import pandas
+
+from inflection_generator import settings
+from inflection_generator.helpers import excel_index
+from inflection_generator.workbook import load_workbook
+
+CELL_RANGE_RE = re.compile(r"([A-Z]+)(\d+):([A-Z]+)(\d+)")
+
+
+class Pattern(NamedTuple):
+    """ Inflection table of a single pattern as sliced from the declensions sheet
+
+    Attributes:
+        name (str): Name of the pattern, e.g. "a masc"
+        like (str): Example word which is inflected by the pattern
+        irreg (bool): Whether the pattern is irregular
+        header (Tuple[str, ...]): Header row of the table, the first cell is
+            always empty
+        rows (Tuple[Tuple[str, ...], ...]): Rows of the table, the first cell
+            of a row is its label, then suffix and grammar cells alternate
+    """
+    name: str
+    like: str
+    irreg: bool
+    header: Tuple[str, ...]
+    rows: Tuple[Tuple[str, ...], ...]
+
+    @property
+    def labels(self) -> Tuple[str, ...]:
+        """ Labels of rows, e.g. "nom"
+        """
+        return tuple(row[0] for row in self.rows)
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """ Labels of columns with suffixes, e.g. "masc sg"
+        """
+        return self.header[1::2]
+
+    @property
+    def cells(self) -> Tuple[Tuple[str, ...], ...]:
+        """ Suffix cells by rows, alternative suffixes of a cell are separated
+        with newlines
+        """
+        return tuple(row[1::2] for row in self.rows)
+
+    @property
+    def suffixes(self) -> Tuple[Tuple[Tuple[str, ...], ...], ...]:
+        """ Lists of suffixes of cells by rows
+        """
+        return tuple(tuple(tuple(cell.split("\n")) for cell in row[1::2]) for row in self.rows)
+
+    def to_frame(self) -> pandas.DataFrame:
+        """ Make data frame as it is exported to the patterns directory
+        """
+        return pandas.DataFrame(
+            [row[1:] for row in self.rows],
+            index=pandas.Index([row[0] for row in self.rows], name=self.header[0]),
+            columns=list(self.header[1:]))
+
+    def to_table(self) -> pandas.DataFrame:
+        """ Make data frame as it is read back from the exported CSV with row
+        labels as index
+
+        Empty and duplicated column labels are named in the same way as
+        `pandas.read_csv` does.
+        """
+        columns: List[str] = []
+        for position, label in enumerate(self.header[1:], start=1):
+            if not label:
+                label = f"Unnamed: {position}"
+            name = label
+            count = 0
+            while name in columns:
+                count += 1
+                name = f"{label}.{count}"
+            columns.append(name)
+
+        return pandas.DataFrame(
+            [row[1:] for row in self.rows],
+            index=pandas.Index([row[0] for row in self.rows]),
+            columns=columns)
+
+
+class PatternStore:
+    """ All patterns of the declensions file compiled in one pickle
+
+    The store is keyed by the content hash of the declensions file, so the
+    file is parsed only when it is changed.
+
+    Attributes:
+        digest (str): SHA-256 of the declensions file the store compiled from
+        index (pandas.DataFrame): Content of the "index" sheet
+        patterns (Dict[str, Pattern]): Compiled patterns by their names
+        changed (List[str]): Names of patterns which differ from the
+            previously stored ones, not pickled
+        compiled (bool): Whether the store was compiled in this process and
+            should be saved, not pickled
+    """
+
+    def __init__(self, digest: str, index: pandas.DataFrame, patterns: Dict[str, Pattern]) -> None:
+        self.digest = digest
+        self.index = index
+        self.patterns = patterns
+        self.changed: List[str] = []
+        self.compiled = False
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["changed"]
+        del state["compiled"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.changed = []
+        self.compiled = False
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as store_file:
+            pickle.dump(self, store_file, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+
+    @staticmethod
+    def load(path: Path) -> Optional["PatternStore"]:
+        try:
+            with open(path, "rb") as store_file:
+                store = pickle.load(store_file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError):
+            return None
+        if not isinstance(store, PatternStore):
+            return None
+        return store
+
+
+# Patterns of the last loaded store shared by all stages of the process
+_registry: Dict[str, Pattern] = {}
+
+
+def register_patterns(patterns: Dict[str, Pattern]) -> None:
+    _registry.clear()
+    _registry.update(patterns)
+
+
+def registry() -> Dict[str, Pattern]:
+    """ Get process-wide registry of patterns by their names
+
+    The registry is filled by `load_pattern_store`, the store is loaded on the
+    first call if it was not yet.
+    """
+    if not _registry:
+        load_pattern_store()
+    return _registry
+
+
+def get_pattern(name: str) -> Pattern:
+    """ Get pattern from the process-wide registry
+
+    :raises KeyError: If there is no such pattern
+    """
+    return registry()[name]
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_index(path: Path = settings.DECLENSIONS_AND_CONJUGATIONS_FILE) -> pandas.DataFrame:
+    return load_workbook(path).index
+
+
+def read_declensions(path: Path = settings.DECLENSIONS_AND_CONJUGATIONS_FILE) -> pandas.DataFrame:
+    """ Read the declensions sheet with rows and columns labeled as in Excel
+    """
+    inflection_table_df = load_workbook(path).declensions.shift(periods=2)
+
+    col_length = len(inflection_table_df.columns)
+    inflection_table_df.columns = [excel_index(i) for i in range(col_length)]
+    return inflection_table_df
+
+
+def compile_pattern(
+        name: str, cell_range: str, like: str, irreg: str,
+        inflection_table: pandas.DataFrame) -> Pattern:
+    match = CELL_RANGE_RE.fullmatch(cell_range)
+    if match is None:
+        raise ValueError(f"Wrong cell range {cell_range} of pattern {name}")
+    col_1, row_1, col_2, row_2 = match.groups()
+
+    cells = inflection_table.loc[int(row_1):int(row_2), col_1:col_2].values.tolist()
+
+    header = ("",) + tuple(re.sub("Unnamed.*", "", cell) for cell in cells[0][1:])
+    rows = tuple(tuple(row) for row in cells[1:])
+
+    return Pattern(name=name, like=like, irreg=bool(irreg), header=header, rows=rows)
+
+
+def compile_patterns(
+        inflection_table_index: pandas.DataFrame,
+        inflection_table: pandas.DataFrame) -> Dict[str, Pattern]:
+    patterns = {}
+    for name, cell_range, like, irreg in inflection_table_index.iloc[:, :4].itertuples(index=False):
+        patterns[name] = compile_pattern(name, cell_range, like, irreg, inflection_table)
+    return patterns
+
+
+def load_pattern_store(
+        declensions_file: Path = settings.DECLENSIONS_AND_CONJUGATIONS_FILE,
+        store_file: Path = settings.PATTERNS_STORE_FILE) -> PatternStore:
+    """ Load compiled patterns, recompile them if the declensions file changed
+
+    Names of patterns which differ from the previously compiled ones are listed
+    in the `changed` attribute of the result. A recompiled store is not saved
+    here, it should be saved when its changes are processed.
+    """
+    digest = file_digest(declensions_file)
+    previous = PatternStore.load(store_file)
+
+    if previous is not None and previous.digest == digest:
+        register_patterns(previous.patterns)
+        return previous
+
+    index = read_index(declensions_file)
+    store = PatternStore(digest, index, compile_patterns(index, read_declensions(declensions_file)))
+
+    previous_patterns = previous.patterns if previous is not None else {}
+    store.changed = [
+        name for name, pattern in store.patterns.items()
+        if previous_patterns.get(name) != pattern]
+    store.compiled = True
+
+    register_patterns(store.patterns)
+    return store
@@ -0,0 +1,71 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from rich import print  # pylint: disable=redefined-builtin
+
+from inflection_generator import manifest
+from inflection_generator.helpers import Kind
+
+
+def stages(kinds: Iterable[Kind]) -> List[str]:
+    """ Get stages which generate artifacts for headwords of the kinds
+    """
+    return [*manifest.SHARED_ARTIFACTS, *(manifest.HTML_TABLES[kind] for kind in kinds)]
+
+
+# Stages of all kinds
+STAGES: List[str] = stages(Kind)
+
+# Reasons to generate an artifact
+ADDED = "added"
+CHANGED = "changed"
+PATTERN_CHANGED = "pattern changed"
+MISSING_INFLECTIONS = "missing inflections"
+
+
+class WorkPlan:
+    """ Headwords to be generated by every stage with a reason for each
+
+    The plan is filled by test stages once and then consumed by generating
+    stages. The first reason added for a headword is kept.
+
+    :param stage_headwords: Headwords of stages which generate artifacts only
+        for headwords of their kind, other stages take all headwords
+    """
+
+    def __init__(
+            self, stages: Optional[List[str]] = None,
+            stage_headwords: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        self.stages = STAGES if stages is None else stages
+        self._items: Dict[str, Dict[str, str]] = {stage: {} for stage in self.stages}
+        self._headwords: Dict[str, Set[str]] = {
+            stage: set(headwords) for stage, headwords in (stage_headwords or {}).items()}
+
+    def add(self, stage: str, headwords: Iterable[str], reason: str) -> None:
+        items = self._items[stage]
+        for headword in headwords:
+            items.setdefault(headword, reason)
+
+    def add_to_all(self, headwords: Iterable[str], reason: str) -> None:
+        headwords = list(headwords)
+        for stage in self.stages:
+            if stage in self._headwords:
+                self.add(stage, [headword for headword in headwords if headword in self._headwords[stage]], reason)
+            else:
+                self.add(stage, headwords, reason)
+
+    def items(self, stage: str) -> Dict[str, str]:
+        """ Get reasons by headwords to be generated by the stage
+        """
+        return self._items[stage]
+
+    def needs(self, stage: str, headword: str) -> bool:
+        return headword in self._items[stage]
+
+    def print_summary(self) -> None:
+        print("~" * 40)
+        print("work plan:")
+        for stage in self.stages:
+            reasons = Counter(self._items[stage].values())
+            details = ", ".join(f"{count} {reason}" for reason, count in reasons.most_common())
+            print(f"{stage}: {len(self._items[stage])}" + (f" ({details})" if details else ""))
@@ -11,6 +11,7 @@ DPS_DIR = Path(os.getenv("DPS_DIR", "../"))
 CSCD_DIR = Path(os.getenv(
     "CSCD_DIR",
     "/home/deva/Documents/dpd-br/pure-machine-readable-corpus/cscd/"))  # TODO Path should not be absolute
+SUTTA_CORRESPONDENCE_FILE = Path("sutta corespondence tables")/"sutta correspondence tables.csv"
 
 # Output paths
 OUTPUT_DIR = Path("output")
@@ -18,8 +19,18 @@ ALL_INFLECTIONS_FILE = OUTPUT_DIR/"all inflections.csv"
 NEW_INFLECTIONS_FILE = OUTPUT_DIR/"new inflections.csv"
 ALL_INFLECTIONS_TRANSLIT_FILE = OUTPUT_DIR/"all inflections translit.csv"
 NEW_INFLECTIONS_TRANSLIT_FILE = OUTPUT_DIR/"new inflections translit.csv"
+INFLECTIONS_STORE_FILE = OUTPUT_DIR/"inflections.sqlite"
+# Per-headword pickles, written on request for legacy consumers
 INFLECTIONS_DIR = OUTPUT_DIR/"inflections"
 INFLECTIONS_TRANSLIT_DIR = OUTPUT_DIR / "inflections translit"
 HTML_TABLES_DPS_DIR = OUTPUT_DIR/"html_tables_dps"
 HTML_TABLES_SBS_DIR = OUTPUT_DIR/"html_tables_sbs"
 HTML_SUTTAS_DIR = OUTPUT_DIR/"html suttas"
+PATTERNS_DIR = OUTPUT_DIR/"patterns"
+PATTERNS_STORE_FILE = OUTPUT_DIR/"patterns.pickle"
+MANIFEST_FILE = OUTPUT_DIR/"manifest.pickle"
+FORM_INDEX_FILE = OUTPUT_DIR/"form index.bin"
+TRANSLIT_CACHE_FILE = OUTPUT_DIR/"translit cache.pickle"
+LEGACY_PICKLE_TEST_DIR = OUTPUT_DIR/"pickle test"
+COVERAGE_FILE = OUTPUT_DIR/"cscd coverage.csv"
+UNRECOGNISED_FORMS_FILE = OUTPUT_DIR/"cscd unrecognised forms.csv"
@@ -1,29 +1,3 @@
-def sort_key(word):
-    pāli_alphabet = [
-        "√", "a", "ā", "i", "ī", "u", "ū", "e", "o", "k", "kh", "g", "gh", "ṅ",
-        "c", "ch", "j", "jh", "ñ", "ṭ", "ṭh", "ḍ", "ḍḥ", "ṇ", "t", "th", "d",
-        "dh", "n", "p", "ph", "b", "bh", "m", "y", "r", "l", "s", "v", "h",
-        "ḷ", "ṃ", " ", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0"
-    ]
-
-    # comp iteration condition
-    dl = [i for i in pali_alphabet if len(i) > 1]
-
-    for i in dl:
-        word = word.replace(i, '/{}'.format(i))
-
-    wordVe = []
-
-    k = -3
-
-    for j in range(len(word)):
-        if word[j] == '/':
-            k = j
-            wordVe.append(word[j + 1:j + 3])
-        if j > k + 2:
-            wordVe.append(word[j])
-
-    word = wordVe
-
-    pali_alphabet_string = '-'.join(pali_alphabet)
-    return [pali_alphabet_string.find('-' + x + '-') for x in wordVe]
+# Kept for imports of previous versions, the order is made by the collation
+# module
+from inflection_generator.collation import sort_key  # noqa: F401 pylint: disable=unused-import
@@ -0,0 +1,165 @@
+import os
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Collections of the store, lists of inflected forms by headwords
+INFLECTIONS = "inflections"
+INFLECTIONS_TRANSLIT = "inflections translit"
+
+COLLECTIONS = [INFLECTIONS, INFLECTIONS_TRANSLIT]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inflections (
+    collection TEXT NOT NULL,
+    headword TEXT NOT NULL,
+    forms TEXT NOT NULL,
+    PRIMARY KEY (collection, headword)
+) WITHOUT ROWID
+"""
+
+
+class InflectionStore:
+    """ Inflection lists of all headwords kept in a single SQLite file
+
+    Forms of a headword are stored space separated, inflected forms never
+    contain spaces. Every bulk operation runs in a single transaction.
+    """
+
+    def __init__(self, path: Path, read_only: bool = False) -> None:
+        """
+        :param read_only: Open an existing store without creating or
+            changing anything
+        """
+        self.path = path
+        if read_only:
+            self.created = False
+            self._connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.created = not path.exists()
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "InflectionStore":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM inflections").fetchone()[0]
+
+    def upsert(self, collection: str, items: Iterable[Tuple[str, List[str]]]) -> None:
+        """ Insert or replace inflection lists of headwords
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO inflections VALUES (?, ?, ?)",
+                ((collection, headword, " ".join(forms)) for headword, forms in items))
+
+    def delete(self, collection: str, headwords: Iterable[str]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM inflections WHERE collection = ? AND headword = ?",
+                ((collection, headword) for headword in headwords))
+
+    def prune(self, collection: str, headwords: Iterable[str]) -> List[str]:
+        """ Delete headwords which are not in the list
+
+        :return: Deleted headwords
+        """
+        unused = sorted(self.headwords(collection) - set(headwords))
+        self.delete(collection, unused)
+        return unused
+
+    def headwords(self, collection: str) -> Set[str]:
+        """ Get all headwords of the collection with a single query, for
+        existence checks of many headwords
+        """
+        cursor = self._connection.execute(
+            "SELECT headword FROM inflections WHERE collection = ?", (collection,))
+        return {headword for headword, in cursor}
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        cursor = self._connection.execute(
+            "SELECT 1 FROM inflections WHERE collection = ? AND headword = ?", key)
+        return cursor.fetchone() is not None
+
+    def get(self, collection: str, headword: str) -> Optional[List[str]]:
+        cursor = self._connection.execute(
+            "SELECT forms FROM inflections WHERE collection = ? AND headword = ?", (collection, headword))
+        row = cursor.fetchone()
+        return None if row is None else _split(row[0])
+
+    def items(self, collection: str) -> Iterable[Tuple[str, List[str]]]:
+        cursor = self._connection.execute(
+            "SELECT headword, forms FROM inflections WHERE collection = ? ORDER BY headword", (collection,))
+        for headword, forms in cursor:
+            yield headword, _split(forms)
+
+    def import_legacy_dir(self, collection: str, path: Path) -> int:
+        """ Import per-headword pickles written by previous versions
+
+        :return: Number of imported headwords
+        """
+        if not path.is_dir():
+            return 0
+
+        items: Dict[str, List[str]] = {}
+        for entry in os.scandir(path):
+            if not entry.is_file():
+                continue
+            try:
+                with open(entry.path, "rb") as pickle_file:
+                    items[entry.name] = pickle.load(pickle_file)
+            except (EOFError, pickle.UnpicklingError):
+                continue
+
+        self.upsert(collection, items.items())
+        return len(items)
+
+    def export_legacy_dir(self, collection: str, path: Path, headwords: Iterable[str] = ()) -> List[str]:
+        """ Write per-headword pickles for consumers of the old layout
+
+        Pickles of the given headwords and all missing ones are written,
+        pickles of headwords which are not in the store are removed.
+
+        :return: Removed headwords
+        """
+        path.mkdir(parents=True, exist_ok=True)
+
+        existing = {entry.name for entry in os.scandir(path) if entry.is_file()}
+        dirty = set(headwords)
+
+        stored = set()
+        for headword, forms in self.items(collection):
+            stored.add(headword)
+            if headword in existing and headword not in dirty:
+                continue
+            with open(path / headword, "wb") as pickle_file:
+                pickle.dump(forms, pickle_file)
+
+        removed = sorted(existing - stored)
+        for headword in removed:
+            os.remove(path / headword)
+
+        return removed
+
+
+def legacy_headwords(path: Path) -> Set[str]:
+    """ Get headwords of per-headword pickles of previous versions without
+    reading them
+    """
+    if not path.is_dir():
+        return set()
+    return {entry.name for entry in os.scandir(path) if entry.is_file()}
+
+
+def _split(forms: str) -> List[str]:
+    return forms.split(" ") if forms else []
@@ -0,0 +1,383 @@
+""" Comparison of suttas and their commentaries with generated inflections
+without prompts and coverage of the whole corpus
+
+Inflections are read and split to categories once, cleaning and comparison
+of texts run in worker processes which get the categories at start.
+"""
+
+import argparse
+import collections
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import Counter, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import pandas
+from rich import print  # pylint: disable=redefined-builtin
+
+from inflection_generator import modules, normalizer, settings
+from inflection_generator.collation import sort_key
+from inflection_generator.helpers import Kind, create_directories, timeis
+from inflection_generator.modules import WordCategories
+
+# Columns of the correspondence table with files of a sutta
+MULA = "mūla"
+ATTHAKATHA = "aṭṭhakathā"
+TIKA = "ṭīkā"
+TEXTS = [MULA, ATTHAKATHA, TIKA]
+
+# Value of codes for all suttas of the correspondence table
+ALL_SUTTAS = "all"
+
+# Separator of the first and the last codes of a range
+RANGE_SEPARATOR = "-"
+
+# Errors of a text which do not stop other texts, missing or broken files
+TEXT_ERRORS = (OSError, UnicodeDecodeError)
+
+# Book of the total row of the coverage report
+ALL_BOOKS = "all"
+
+# Unrecognised forms printed at the end of the scan
+UNRECOGNISED_SHOWN = 20
+
+
+class Text(NamedTuple):
+    file_name: str
+    # Only texts of suttas have examples and HTML
+    is_sutta: bool
+
+
+def read_correspondence_table(path: Path = settings.SUTTA_CORRESPONDENCE_FILE) -> Dict[str, Dict[str, str]]:
+    """ Get files of texts by sutta codes in the order of the table, missing
+    texts are empty strings
+    """
+    table = pandas.read_csv(path, sep="\t", index_col=0, dtype=str, keep_default_na=False)
+    return table.to_dict(orient="index")
+
+
+def select_suttas(codes: List[str], table: Dict[str, Dict[str, str]]) -> List[str]:
+    """ Get codes of suttas by codes, ranges like "dn1-dn5" of the table
+    order and "all"
+
+    :raise ValueError: If a code is not in the table
+    """
+    all_codes = list(table)
+    positions = {code: position for position, code in enumerate(all_codes)}
+
+    def split_range(code: str) -> Tuple[int, int]:
+        # Codes may have the separator too, so every split is tried
+        parts = code.split(RANGE_SEPARATOR)
+        for index in range(1, len(parts)):
+            first, last = RANGE_SEPARATOR.join(parts[:index]), RANGE_SEPARATOR.join(parts[index:])
+            if first in positions and last in positions:
+                return positions[first], positions[last]
+        raise ValueError(f"sutta number {code} not recognised")
+
+    selected: List[str] = []
+    for code in codes:
+        if code == ALL_SUTTAS:
+            selected.extend(all_codes)
+        elif code in positions:
+            selected.append(code)
+        else:
+            first, last = split_range(code)
+            selected.extend(all_codes[first:last + 1])
+
+    return list(dict.fromkeys(selected))
+
+
+def texts_of_suttas(codes: List[str], table: Dict[str, Dict[str, str]]) -> List[Text]:
+    """ Get unique texts of suttas, a commentary shared by several suttas is
+    processed once
+    """
+    texts: Dict[str, bool] = {}
+    for code in codes:
+        for column in TEXTS:
+            file_name = table[code][column]
+            if file_name:
+                texts[file_name] = texts.get(file_name, False) or column == MULA
+    return [Text(file_name, is_sutta) for file_name, is_sutta in texts.items()]
+
+
+def analyse_text(text: Text, categories: WordCategories, input_dir: Path, output_dir: Path) -> int:
+    """ Clean the text, write its comparison table and HTML of a sutta
+
+    :return: Number of unique words
+    """
+    with open(input_dir / text.file_name, "r") as input_file, open(output_dir / text.file_name, "w") as output_file:
+        output_file.writelines(normalizer.clean_lines(input_file))
+
+    words_df = modules.comparison_table(modules.read_words(output_dir / text.file_name), categories, text.is_sutta)
+    modules.write_comparison_table(words_df, output_dir / f"{text.file_name}.csv")
+
+    if text.is_sutta:
+        with open(output_dir / text.file_name, "r") as input_file:
+            sutta_text = modules.highlighted_sutta(input_file.read(), words_df)
+        with open(output_dir / f"{text.file_name}.html", "w") as html_file:
+            html_file.write(modules.sutta_page(sutta_text))
+
+    return words_df.shape[0]
+
+
+# Categories of a worker process, set once by the initializer
+_worker_categories: Optional[WordCategories] = None
+
+
+def _init_worker(categories: WordCategories) -> None:
+    global _worker_categories
+    _worker_categories = categories
+
+
+def _analyse_text_in_worker(text: Text, input_dir: Path, output_dir: Path) -> int:
+    assert _worker_categories is not None
+    return analyse_text(text, _worker_categories, input_dir, output_dir)
+
+
+def analyse_texts(
+        texts: List[Text], categories: WordCategories, jobs: int = 1,
+        input_dir: Path = settings.CSCD_DIR, output_dir: Path = settings.HTML_SUTTAS_DIR) -> List[str]:
+    """ Analyse texts in `jobs` processes, a text which fails is reported and
+    skipped
+
+    :return: Files of failed texts
+    """
+    failed: List[str] = []
+
+    def report(text: Text, error: Optional[BaseException], words: int = 0) -> None:
+        if error is None:
+            print(f"{timeis()} {text.file_name} {words} words")
+        else:
+            print(f"{timeis()} [red]{text.file_name} failed: {error}")
+            failed.append(text.file_name)
+
+    if jobs <= 1 or len(texts) <= 1:
+        for text in texts:
+            try:
+                report(text, None, analyse_text(text, categories, input_dir, output_dir))
+            except TEXT_ERRORS as error:
+                report(text, error)
+        return failed
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(categories,)) as executor:
+        futures = {
+            executor.submit(_analyse_text_in_worker, text, input_dir, output_dir): text for text in texts}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None and not isinstance(error, TEXT_ERRORS):
+                raise error
+            report(futures[future], error, 0 if error is not None else future.result())
+
+    return failed
+
+
+def batch(args: argparse.Namespace) -> int:
+    print(f"{timeis()} ----------------------------------------")
+    print(f"{timeis()} [yellow]sutta batch")
+
+    create_directories()
+
+    table = read_correspondence_table()
+    try:
+        codes = select_suttas(args.codes, table)
+    except ValueError as error:
+        print(f"{timeis()} [red]{error}")
+        return 2
+
+    kind = Kind[args.kind]
+    data, _ = modules.create_data_frame(modules.data_file(kind, args.class_file_name))
+    categories = modules.make_word_categories(data, kind, args.class_file_name)
+
+    texts = texts_of_suttas(codes, table)
+    print(f"{timeis()} [green]analysing {len(texts)} texts of {len(codes)} suttas")
+    failed = analyse_texts(texts, categories, args.jobs or os.cpu_count() or 1)
+
+    if failed:
+        print(f"{timeis()} [red]{len(failed)} texts failed")
+    print(f"{timeis()} ----------------------------------------")
+    return 1 if failed else 0
+
+
+class FileCoverage(NamedTuple):
+    book: str
+    tokens: int
+    recognised: int
+    unrecognised: Counter[str]
+
+
+def book_of(file_name: str) -> str:
+    """ Get book of a corpus file, parts of a book share the name before the
+    first dot
+    """
+    return file_name.split(".", 1)[0]
+
+
+def scan_file(path: Path, inflections: Set[str]) -> FileCoverage:
+    """ Count tokens of a corpus file cleaned as texts of suttas, the file is
+    streamed by blocks of lines
+    """
+    counts: Counter[str] = collections.Counter()
+    with open(path, "r") as input_file:
+        for block in normalizer.clean_lines(input_file):
+            counts.update(block.split())
+
+    unrecognised = collections.Counter({form: count for form, count in counts.items() if form not in inflections})
+    tokens = sum(counts.values())
+    return FileCoverage(book_of(path.name), tokens, tokens - sum(unrecognised.values()), unrecognised)
+
+
+# Inflections of a worker process, set once by the initializer
+_worker_inflections: Optional[Set[str]] = None
+
+
+def _init_coverage_worker(inflections: Set[str]) -> None:
+    global _worker_inflections
+    _worker_inflections = inflections
+
+
+def _scan_file_in_worker(path: Path) -> FileCoverage:
+    assert _worker_inflections is not None
+    return scan_file(path, _worker_inflections)
+
+
+def scan_files(paths: List[Path], inflections: Set[str], jobs: int = 1) -> Iterator[FileCoverage]:
+    """ Scan files in `jobs` processes and yield their coverage as they are
+    done, at most two files per process are in flight
+    """
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield scan_file(path, inflections)
+        return
+
+    with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_coverage_worker, initargs=(inflections,)) as executor:
+        pending = iter(paths)
+        in_flight = {executor.submit(_scan_file_in_worker, path) for path in itertools.islice(pending, 2 * jobs)}
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for path in itertools.islice(pending, len(done)):
+                in_flight.add(executor.submit(_scan_file_in_worker, path))
+            for future in done:
+                yield future.result()
+
+
+class CorpusCoverage:
+    """ Token counts of books and unrecognised forms of the whole corpus,
+    counters of files are merged as they come
+    """
+
+    def __init__(self) -> None:
+        self.files: Counter[str] = collections.Counter()
+        self.tokens: Counter[str] = collections.Counter()
+        self.recognised: Counter[str] = collections.Counter()
+        self.unrecognised: Counter[str] = collections.Counter()
+
+    def add(self, file_coverage: FileCoverage) -> None:
+        self.files[file_coverage.book] += 1
+        self.tokens[file_coverage.book] += file_coverage.tokens
+        self.recognised[file_coverage.book] += file_coverage.recognised
+        self.unrecognised.update(file_coverage.unrecognised)
+
+    def books(self) -> pandas.DataFrame:
+        """ Get coverage of every book in the order of names followed by the
+        total
+        """
+        rows = [
+            (book, self.files[book], self.tokens[book], self.recognised[book])
+            for book in sorted(self.tokens)]
+        rows.append((ALL_BOOKS, sum(self.files.values()), sum(self.tokens.values()), sum(self.recognised.values())))
+
+        books_df = pandas.DataFrame(rows, columns=["book", "files", "tokens", "recognised"])
+        books_df["coverage"] = (books_df["recognised"] / books_df["tokens"].where(books_df["tokens"] > 0)).fillna(0)
+        return books_df
+
+    def top_unrecognised(self, top: int) -> List[Tuple[str, int]]:
+        """ Get the most frequent unrecognised forms, forms of the same count
+        are in the Pāli order
+        """
+        most_common = self.unrecognised.most_common(top)
+        if not most_common:
+            return []
+        least_count = most_common[-1][1]
+        forms = [(form, count) for form, count in self.unrecognised.items() if count >= least_count]
+        return sorted(forms, key=lambda item: (-item[1], sort_key(item[0])))[:top]
+
+
+def corpus_files(input_dir: Path) -> List[Path]:
+    return sorted(path for path in input_dir.iterdir() if path.is_file())
+
+
+def scan_corpus(paths: List[Path], inflections: Set[str], jobs: int = 1) -> CorpusCoverage:
+    corpus_coverage = CorpusCoverage()
+    for done, file_coverage in enumerate(scan_files(paths, inflections, jobs), start=1):
+        corpus_coverage.add(file_coverage)
+        if file_coverage.tokens:
+            print(
+                f"{timeis()} {done}/{len(paths)} {file_coverage.book} {file_coverage.tokens} tokens "
+                f"{file_coverage.recognised / file_coverage.tokens:.1%}")
+    return corpus_coverage
+
+
+def coverage(args: argparse.Namespace) -> int:
+    print(f"{timeis()} ----------------------------------------")
+    print(f"{timeis()} [yellow]cscd coverage")
+
+    create_directories()
+
+    paths = corpus_files(settings.CSCD_DIR)
+    if not paths:
+        print(f"{timeis()} [red]no files in {settings.CSCD_DIR}")
+        return 1
+
+    inflections = modules.read_inflections()
+    print(f"{timeis()} [green]scanning {len(paths)} files with {len(inflections)} inflections")
+    corpus_coverage = scan_corpus(paths, inflections, args.jobs or os.cpu_count() or 1)
+
+    books_df = corpus_coverage.books()
+    books_df.to_csv(settings.COVERAGE_FILE, sep="\t", index=False, float_format="%.4f")
+
+    unrecognised_df = pandas.DataFrame(corpus_coverage.top_unrecognised(args.top), columns=["form", "count"])
+    unrecognised_df.to_csv(settings.UNRECOGNISED_FORMS_FILE, sep="\t", index=False)
+
+    total = books_df.iloc[-1]
+    print(f"{timeis()} [green]{total['recognised']} of {total['tokens']} tokens recognised, {total['coverage']:.2%}")
+    print(f"{timeis()} most frequent unrecognised forms:")
+    shown = unrecognised_df.head(UNRECOGNISED_SHOWN).itertuples(index=False)
+    print(" ".join(f"{form} {count}" for form, count in shown))
+    print(f"{timeis()} report written to {settings.COVERAGE_FILE} and {settings.UNRECOGNISED_FORMS_FILE}")
+    print(f"{timeis()} ----------------------------------------")
+    return 0
+
+
+def get_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="compare suttas with generated inflections")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="write comparison tables and html of suttas without prompts")
+    batch_parser.add_argument(
+        "codes", nargs="+", metavar="CODE",
+        help=f"sutta numbers of the correspondence table, ranges like dn1-dn5 or {ALL_SUTTAS}")
+    batch_parser.add_argument(
+        "--kind", choices=[i.name for i in Kind], default=Kind.DPS.name,
+        help="data and categories of highlighted words")
+    batch_parser.add_argument("--class-file-name", type=str, default='1')
+    batch_parser.add_argument(
+        "--jobs", type=int, default=1, help="number of worker processes, 0 for the number of CPUs")
+    batch_parser.set_defaults(func=batch)
+
+    coverage_parser = subparsers.add_parser(
+        "coverage", help="count tokens of every file of the cscd corpus recognised by generated inflections")
+    coverage_parser.add_argument(
+        "--top", type=int, default=1000, help="number of the most frequent unrecognised forms in the report")
+    coverage_parser.add_argument(
+        "--jobs", type=int, default=1, help="number of worker processes, 0 for the number of CPUs")
+    coverage_parser.set_defaults(func=coverage)
+
+    return parser
+
+
+def main() -> None:
+    args = get_argparser().parse_args()
+    raise SystemExit(args.func(args))
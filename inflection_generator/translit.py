@@ -0,0 +1,187 @@
+import collections
+import itertools
+import pickle
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from rich import print  # pylint: disable=redefined-builtin
+
+from inflection_generator import transliterator
+from inflection_generator.memo import Memo
+
+FORMAT_VERSION = 1
+
+# Lines of inflections sent to a worker at once
+CHUNK_SIZE = 1000
+
+# Engines, cached tokens are dropped when the engine changes
+NATIVE = "native"
+AKSHARAMUKHA = "aksharamukha"
+
+
+def _native_tokens(tokens: List[str]) -> List[Tuple[str, str]]:
+    """ Make Cyrillic and Devanagari forms of tokens with the built-in
+    tables, tokens with characters out of the alphabet are kept as is
+    """
+    result = []
+    unsupported = []
+
+    for token in tokens:
+        if transliterator.is_supported(token):
+            result.append((transliterator.to_cyrillic(token), transliterator.to_devanagari(token)))
+        else:
+            unsupported.append(token)
+            result.append((token, token))
+
+    if unsupported:
+        print(f"[red]{len(unsupported)} tokens are not transliterated, use {AKSHARAMUKHA} engine for them:")
+        print("|".join(unsupported))
+
+    return result
+
+
+def _aksharamukha_tokens(tokens: List[str]) -> List[Tuple[str, str]]:
+    """ Make Cyrillic and Devanagari forms of tokens with one call per script
+    """
+    # Heavy import, only done if the engine is chosen
+    from aksharamukha import transliterate  # pylint: disable=import-outside-toplevel
+
+    if not tokens:
+        return []
+
+    text = "\n".join(tokens)
+    cyrillic = transliterate.process("IAST", "RussianCyrillic", text, post_options=['CyrillicPali'])
+    devanagari = transliterate.process("IAST", "Devanagari", text, post_options=['DevanagariAnusvara'])
+
+    return list(zip(cyrillic.split("\n"), devanagari.split("\n")))
+
+
+ENGINES: Dict[str, Callable[[List[str]], List[Tuple[str, str]]]] = {
+    NATIVE: _native_tokens,
+    AKSHARAMUKHA: _aksharamukha_tokens,
+}
+
+
+def transliterate_tokens(tokens: List[str], engine: str = NATIVE) -> List[Tuple[str, str]]:
+    return ENGINES[engine](tokens)
+
+
+class TokenCache(Memo[Tuple[str, str]]):
+    """ Cyrillic and Devanagari forms of inflected forms kept between runs
+
+    Inflections are transliterated token by token, the same forms recur in
+    many headwords, so only tokens which were never seen go to the engine.
+    """
+
+    def __init__(self, path: Path, engine: str = NATIVE) -> None:
+        super().__init__("transliteration cache")
+        self.path = path
+        self.engine = engine
+        self._saved_size = 0
+
+    @classmethod
+    def load(cls, path: Path, engine: str = NATIVE) -> "TokenCache":
+        cache = cls(path, engine)
+        try:
+            with open(path, "rb") as cache_file:
+                content = pickle.load(cache_file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return cache
+
+        if content.get("version") == FORMAT_VERSION and content.get("engine") == engine:
+            cache._values = content["tokens"]
+            cache._saved_size = len(cache)
+        return cache
+
+    def save(self) -> None:
+        if len(self) == self._saved_size:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as cache_file:
+            pickle.dump(
+                {"version": FORMAT_VERSION, "engine": self.engine, "tokens": self._values},
+                cache_file,
+                protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(self.path)
+        self._saved_size = len(self)
+
+    def missing(self, tokens: Iterable[str], pending: Iterable[str] = ()) -> List[str]:
+        """ Get unique tokens which are neither cached nor pending, count
+        them as misses and other tokens as hits
+        """
+        tokens = [token for token in tokens if token]
+        pending = set(pending)
+        missing = list(dict.fromkeys(
+            token for token in tokens if token not in self._values and token not in pending))
+        self.misses += len(missing)
+        self.hits += len(tokens) - len(missing)
+        return missing
+
+    def add(self, tokens: List[str], pairs: List[Tuple[str, str]]) -> None:
+        self._values.update(zip(tokens, pairs))
+
+    def line(self, inflections: str) -> str:
+        """ Make Cyrillic inflections followed by Devanagari ones for space
+        separated inflections, all tokens should be cached
+        """
+        pairs = [self._values[token] if token else ("", "") for token in inflections.split(" ")]
+        return " ".join(cyrillic for cyrillic, _ in pairs) + " ".join(devanagari for _, devanagari in pairs)
+
+    def transliterate(self, inflections: List[str]) -> List[str]:
+        missing = self.missing(token for line_inflections in inflections for token in line_inflections.split(" "))
+        self.add(missing, transliterate_tokens(missing, self.engine))
+        return [self.line(line_inflections) for line_inflections in inflections]
+
+
+def _done(result: List[Tuple[str, str]]) -> "Future[List[Tuple[str, str]]]":
+    future: "Future[List[Tuple[str, str]]]" = Future()
+    future.set_result(result)
+    return future
+
+
+def transliterate_lines(lines: Iterable[str], token_cache: TokenCache, jobs: int = 1) -> Iterator[str]:
+    """ Append transliteration to "headword\tinflections" lines keeping their
+    order
+
+    Lines are read and yielded by chunks. Tokens of a chunk which are
+    missing in the cache are transliterated by a pool of `jobs` processes,
+    at most two chunks per process are in flight.
+    """
+    executor: Optional[Executor] = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    in_flight: Deque[Tuple[List[str], List[str], Future]] = collections.deque()
+    pending: Set[str] = set()
+
+    def complete_first() -> List[str]:
+        chunk, missing, future = in_flight.popleft()
+        token_cache.add(missing, future.result())
+        pending.difference_update(missing)
+        return [line + token_cache.line(line.split("\t", 1)[1]) for line in chunk]
+
+    try:
+        lines = iter(lines)
+        while True:
+            chunk = list(itertools.islice(lines, CHUNK_SIZE))
+            if not chunk:
+                break
+
+            missing = token_cache.missing(
+                (token for line in chunk for token in line.split("\t", 1)[1].split(" ")), pending)
+            pending.update(missing)
+
+            if executor is None:
+                future = _done(transliterate_tokens(missing, token_cache.engine))
+            else:
+                future = executor.submit(transliterate_tokens, missing, token_cache.engine)
+            in_flight.append((chunk, missing, future))
+
+            if len(in_flight) > 2 * jobs:
+                yield from complete_first()
+
+        while in_flight:
+            yield from complete_first()
+
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,160 @@
+""" Pāli IAST to Cyrillic and Devanagari transliteration
+
+Output is the same as of aksharamukha IAST to RussianCyrillic with
+CyrillicPali post option and IAST to Devanagari with DevanagariAnusvara post
+option for tokens of the supported alphabet.
+"""
+
+import re
+import string
+from typing import Dict, List
+
+VOWELS: Dict[str, str] = {
+    "a": "а", "ā": "а̄", "i": "и", "ī": "ӣ", "u": "у", "ū": "ӯ", "e": "э", "o": "о",
+    "ai": "аи", "au": "ау", "ṛ": "р̣", "ḷ": "л̣",
+}
+
+CONSONANTS: Dict[str, str] = {
+    "k": "к", "kh": "кх", "g": "г", "gh": "гх", "ṅ": "н̇",
+    "c": "ч", "ch": "чх", "j": "дж", "jh": "джх", "ñ": "н̃",
+    "ṭ": "т̣", "ṭh": "т̣х", "ḍ": "д̣", "ḍh": "д̣х", "ṇ": "н̣",
+    "t": "т", "th": "тх", "d": "д", "dh": "дх", "n": "н",
+    "p": "п", "ph": "пх", "b": "б", "bh": "бх", "m": "м",
+    "y": "й", "r": "р", "l": "л", "v": "в", "ś": "ш́", "ṣ": "ш", "s": "с", "h": "х",
+}
+
+# Characters which are kept as is by both scripts. Backslash, brackets and
+# some others make accents and joiners in combinations, "." and "|" become
+# danda and "_" is dropped in Devanagari.
+PASS_THROUGH = sorted(set(string.punctuation + "wx√–’") - set("._|'\\`^()[]{}"))
+
+# Signs which are not vowels or consonants
+OTHERS: Dict[str, str] = {
+    "ṃ": "м̣", "ṁ": "м̣", "ḥ": "х̣", "'": "'",
+    **{digit: digit for digit in "0123456789"},
+    **{char: char for char in PASS_THROUGH},
+}
+
+DEVANAGARI_VOWELS: Dict[str, str] = {
+    "a": "अ", "ā": "आ", "i": "इ", "ī": "ई", "u": "उ", "ū": "ऊ", "e": "ए", "o": "ओ",
+    "ai": "ऐ", "au": "औ", "ṛ": "ऋ", "ḷ": "ऌ",
+}
+
+DEVANAGARI_VOWEL_SIGNS: Dict[str, str] = {
+    "a": "", "ā": "ा", "i": "ि", "ī": "ी", "u": "ु", "ū": "ू", "e": "े", "o": "ो",
+    "ai": "ै", "au": "ौ", "ṛ": "ृ", "ḷ": "ॢ",
+}
+
+DEVANAGARI_CONSONANTS: Dict[str, str] = {
+    "k": "क", "kh": "ख", "g": "ग", "gh": "घ", "ṅ": "ङ",
+    "c": "च", "ch": "छ", "j": "ज", "jh": "झ", "ñ": "ञ",
+    "ṭ": "ट", "ṭh": "ठ", "ḍ": "ड", "ḍh": "ढ", "ṇ": "ण",
+    "t": "त", "th": "थ", "d": "द", "dh": "ध", "n": "न",
+    "p": "प", "ph": "फ", "b": "ब", "bh": "भ", "m": "म",
+    "y": "य", "r": "र", "l": "ल", "v": "व", "ś": "श", "ṣ": "ष", "s": "स", "h": "ह",
+}
+
+# Om placeholder, put in place of "oṃ" which stands alone
+OM = "\ue000"
+
+DEVANAGARI_OTHERS: Dict[str, str] = {
+    "ṃ": "ं", "ṁ": "ं", "ḥ": "ः", "'": "ऽ", OM: "ॐ",
+    **dict(zip("0123456789", "०१२३४५६७८९")),
+    **{char: char for char in PASS_THROUGH},
+}
+
+VIRAMA = "्"
+ANUSVARA = "ं"
+
+# Nasals of the velar, palatal, retroflex, dental and labial classes and
+# stops of the same classes
+NASALS = ["ङ", "ञ", "ण", "न", "म"]
+STOPS = ["कखगघ", "चछजझ", "टठडढ", "तथदध", "पफबभ"]
+
+# Signs after which a nasal of a conjunct with a stop of its class becomes
+# anusvara
+_LETTERS = "".join([
+    *DEVANAGARI_VOWELS.values(), *DEVANAGARI_VOWEL_SIGNS.values(), *DEVANAGARI_CONSONANTS.values(), "ंः"])
+
+_NASAL_TO_ANUSVARA = [
+    re.compile(f"([{_LETTERS}])({nasal}){VIRAMA}([{stops}])")
+    for nasal, stops in zip(NASALS, STOPS)]
+
+_PUNCTUATION = f"([{re.escape(string.punctuation)}])"
+
+_OM_RES = [
+    (re.compile(_PUNCTUATION + "oṃ" + _PUNCTUATION), r"\1" + OM + r"\2"),
+    (re.compile("^oṃ" + _PUNCTUATION), OM + r"\1"),
+    (re.compile(_PUNCTUATION + "oṃ$"), r"\1" + OM),
+    (re.compile("^oṃ$"), OM),
+]
+
+
+class _Units:
+    """ Longest-match splitter of tokens to units of the alphabet
+    """
+
+    def __init__(self, units: List[str]) -> None:
+        # Longest units are tried first, so "kh" is not split to "k" and "h"
+        units = sorted(units, key=len, reverse=True)
+        self._unit_re = re.compile("|".join(map(re.escape, units)))
+        self._supported_re = re.compile(f"(?:{self._unit_re.pattern})*")
+
+    def split(self, token: str) -> List[str]:
+        if not self._supported_re.fullmatch(token):
+            raise ValueError(f"unsupported characters in {token!r}")
+        return self._unit_re.findall(token)
+
+    def is_supported(self, token: str) -> bool:
+        return self._supported_re.fullmatch(token) is not None
+
+
+_CYRILLIC_UNITS = _Units([*VOWELS, *CONSONANTS, *OTHERS])
+_DEVANAGARI_UNITS = _Units([*VOWELS, *CONSONANTS, *DEVANAGARI_OTHERS])
+
+
+def is_supported(token: str) -> bool:
+    return _CYRILLIC_UNITS.is_supported(token.lower())
+
+
+def to_cyrillic(token: str) -> str:
+    units = _CYRILLIC_UNITS.split(token.lower())
+    return "".join(VOWELS.get(unit) or CONSONANTS.get(unit) or OTHERS[unit] for unit in units)
+
+
+def to_devanagari(token: str) -> str:
+    token = token.replace("ṁ", "ṃ")
+    for regex, replacement in _OM_RES:
+        token = regex.sub(replacement, token)
+    units = _DEVANAGARI_UNITS.split(token.lower())
+
+    result = []
+    after_consonant = False
+
+    for unit in units:
+        if unit in VOWELS:
+            result.append(DEVANAGARI_VOWEL_SIGNS[unit] if after_consonant else DEVANAGARI_VOWELS[unit])
+            after_consonant = False
+        elif unit in CONSONANTS:
+            if after_consonant:
+                result.append(VIRAMA)
+            result.append(DEVANAGARI_CONSONANTS[unit])
+            after_consonant = True
+        else:
+            if after_consonant:
+                result.append(VIRAMA)
+            result.append(DEVANAGARI_OTHERS[unit])
+            after_consonant = False
+
+    if after_consonant:
+        result.append(VIRAMA)
+
+    text = "".join(result)
+
+    # Overlapping conjuncts are left by the first pass and replaced by the
+    # second one
+    for regex in _NASAL_TO_ANUSVARA:
+        text = regex.sub(r"\1" + ANUSVARA + r"\3", text)
+        text = regex.sub(r"\1" + ANUSVARA + r"\3", text)
+
+    return text
@@ -0,0 +1,65 @@
+import functools
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas
+
+SHEET_OPTIONS = {
+    "index": {"na_filter": False},
+    "declensions": {"keep_default_na": False},
+    "abbreviations": {"keep_default_na": True},
+}
+
+
+class Workbook:
+    """ Sheets of a declensions file parsed as by `pandas.read_excel`
+
+    A sheet is parsed on the first access and kept, so users which need one
+    sheet do not pay for the others. Frames are shared between all users of
+    the workbook in the process and must not be modified in place. A sheet
+    missing in the file is None.
+
+    Attributes:
+        index (pandas.DataFrame): "index" sheet, empty cells are ""
+        declensions (pandas.DataFrame): "declensions" sheet, empty cells are ""
+        abbreviations (pandas.DataFrame): "abbreviations" sheet, empty cells
+            are NaN
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._sheets: Dict[str, Optional[pandas.DataFrame]] = {}
+
+    def sheet(self, sheet_name: str) -> Optional[pandas.DataFrame]:
+        if sheet_name not in self._sheets:
+            # The workbook is opened in the read-only mode and only the sheet
+            # is streamed from it
+            with pandas.ExcelFile(self.path, engine="openpyxl") as excel_file:
+                if sheet_name in excel_file.sheet_names:
+                    self._sheets[sheet_name] = excel_file.parse(sheet_name, dtype=str, **SHEET_OPTIONS[sheet_name])
+                else:
+                    self._sheets[sheet_name] = None
+        return self._sheets[sheet_name]
+
+    @property
+    def index(self) -> Optional[pandas.DataFrame]:
+        return self.sheet("index")
+
+    @property
+    def declensions(self) -> Optional[pandas.DataFrame]:
+        return self.sheet("declensions")
+
+    @property
+    def abbreviations(self) -> Optional[pandas.DataFrame]:
+        return self.sheet("abbreviations")
+
+
+@functools.lru_cache(maxsize=None)
+def _load_workbook(path: Path) -> Workbook:
+    return Workbook(path)
+
+
+def load_workbook(path: Path) -> Workbook:
+    """ Get sheets of the workbook, every sheet is read once per process
+    """
+    return _load_workbook(Path(path).resolve())
@@ -4,11 +4,8 @@ cd output
 
 mkdir "html_tables_dps"
 mkdir "html_tables_sbs"
-mkdir "inflections"
 mkdir "inflections in table"
-mkdir "inflections translit"
 mkdir "patterns"
-mkdir "pickle test"
 touch "all inflections.csv"
 touch "all inflections translit.csv"
 touch "new inflections.csv"
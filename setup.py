@@ -10,17 +10,21 @@ setup(
     license=None,
     description='Generate inflections for Pāli dictionaries',
     install_requires=(
-        'aksharamukha~=2.0',
+        'numpy~=1.17',
         'openpyxl~=3.0',
         'pandas-ods-reader~=0.1',
         'pandas~=1.0',
         'rich~=12.0',
     ),
+    extras_require={
+        'aksharamukha': ['aksharamukha~=2.0'],
+    },
     tests_require=['pytest'],
     include_package_data=True,
     entry_points={
         'console_scripts': [
             'inflection-generator=inflection_generator.cli:main',
+            'inflection-suttas=inflection_generator.suttas:main',
         ]
     },
     classifiers=[
@@ -3,26 +3,30 @@
 import warnings
 
 from inflection_generator import modules, settings
+from inflection_generator.planner import WorkPlan
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 
 def main():
     # modules.convert_dpd_ods_to_csv()
-    inflection_table_index = modules.create_inflection_table_index()
-    inflection_table = modules.create_inflection_table_df()
-    modules.test_inflection_pattern_changed(inflection_table_index, inflection_table)
+    pattern_store = modules.load_pattern_store()
+    inflection_table_index = pattern_store.index
+    pattern_changed = modules.test_inflection_pattern_changed(pattern_store)
 
     csv_file = settings.DPS_DIR/"spreadsheets"/"dps-full.csv"
     data, _ = modules.create_data_frame(csv_file)
 
+    plan = WorkPlan()
     modules.test_for_missing_stem_and_pattern(data)
     modules.test_for_wrong_patterns(inflection_table_index, data)
-    modules.test_for_differences_in_stem_and_pattern(data)
-    modules.test_if_inflections_exist_suttas(data)
-    modules.generate_changed_inflected_forms(data)
+    change_manifest = modules.test_for_differences_in_stem_and_pattern(data, plan, pattern_changed)
+    modules.test_if_inflections_exist_suttas(data, plan)
+    modules.generate_changed_inflected_forms(data, plan)
     diff = modules.combine_old_and_new_dataframes()
-    modules.export_inflections_to_pickle(diff)
+    modules.export_inflections_to_store(diff)
+    modules.export_inflection_patterns(pattern_store, pattern_changed)
+    modules.save_change_manifest(change_manifest)
     modules.make_list_of_all_inflections()
     modules.make_list_of_all_inflections_no_meaning(data)
     modules.make_list_of_all_inflections_no_eg1(data)
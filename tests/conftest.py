@@ -0,0 +1,68 @@
+import openpyxl
+import pandas
+import pytest
+
+from inflection_generator.helpers import excel_index
+
+DECLENSIONS_ROWS = [
+    ["nouns"],
+    [],
+    ["a masc", "masc sg", "", "masc pl", ""],
+    ["nom", "o", "masc nom sg", "ā\nāse", "masc nom pl"],
+    ["acc", "aṃ", "masc acc sg", "e", "masc acc pl"],
+    # Rows are shifted down by two when the sheet is read, so the last two
+    # rows are dropped
+    [],
+    ["verbs"],
+]
+
+
+def write_workbook(path, declensions_rows=DECLENSIONS_ROWS):
+    """ Write declensions file with a single "a masc" pattern
+    """
+    workbook = openpyxl.Workbook()
+    index_sheet = workbook.active
+    index_sheet.title = "index"
+    index_sheet.append(["inflection name", "cell range", "like", "irreg"])
+    index_sheet.append(["a masc", "A3:E5", "dhamma", ""])
+
+    # Cells are written by coordinates, appending an empty row writes nothing
+    declensions_sheet = workbook.create_sheet("declensions")
+    for row_number, row in enumerate(declensions_rows, start=1):
+        for column_number, value in enumerate(row, start=1):
+            declensions_sheet.cell(row=row_number, column=column_number, value=value)
+
+    abbreviations_sheet = workbook.create_sheet("abbreviations")
+    abbreviations_sheet.append(["name", "description", "cyrl"])
+    abbreviations_sheet.append(["nom", "nominative", "имен."])
+    abbreviations_sheet.append(["masc", "masculine", None])
+
+    workbook.save(path)
+    return path
+
+
+@pytest.fixture
+def make_workbook(tmp_path):
+    """ Get function which writes a declensions file with the given rows of
+    the declensions sheet to the temporary directory
+    """
+    return lambda name, declensions_rows=DECLENSIONS_ROWS: write_workbook(tmp_path / name, declensions_rows)
+
+
+@pytest.fixture
+def workbook_file(make_workbook):
+    return make_workbook("declensions.xlsx")
+
+
+@pytest.fixture
+def declensions():
+    """ Declensions sheet with a single "a masc" pattern labeled as in Excel
+    """
+    data = [
+        ["", "masc sg", "", "masc pl", ""],
+        ["nom", "o", "masc nom sg", "ā\nāse", "masc nom pl"],
+        ["acc", "aṃ", "masc acc sg", "e", "masc acc pl"],
+    ]
+    frame = pandas.DataFrame(data, index=[3, 4, 5])
+    frame.columns = [excel_index(i) for i in range(len(frame.columns))]
+    return frame
@@ -27,3 +27,21 @@ def test_transalte_no_entry(abbrev):
     assert abbrev.translate_string('eyke') == 'eyke'
     assert abbrev.translate_string('value') == 'value'
     assert abbrev.translate_string('ke ke') == 'ke ke'
+
+
+def test_translate_multi_token_keys(abbrev):
+    abbrev.set_dict({'in comps': 'A', 'comps': 'B', 'a b': 'X', 'b c d': 'Y'})
+    assert abbrev.translate_string('in comps') == 'A'
+    assert abbrev.translate_string('in in comps') == 'in A'
+    assert abbrev.translate_string('in  comps') == 'in  B'
+    # Longer keys are translated first
+    assert abbrev.translate_string('a b c d') == 'a Y'
+
+
+def test_translations_are_memoized(abbrev):
+    abbrev.translate_string('key str')
+    abbrev.translate_string('key str')
+    assert (abbrev.memo.hits, abbrev.memo.misses) == (1, 1)
+
+    abbrev.set_dict({'str': 'value'})
+    assert abbrev.translate_string('key str') == 'key value'
@@ -0,0 +1,27 @@
+from inflection_generator import sorter
+from inflection_generator.collation import sort_key, sort_pali
+
+
+def test_alphabet_order():
+    words = ["ḍhaka", "ñāṇa", "kamma", "ḍaka", "khanti", "āsava", "dhamma 1", "dhamma", "√kar", "ṭhāna"]
+    assert sort_pali(words) == [
+        "√kar", "āsava", "kamma", "khanti", "ñāṇa", "ṭhāna", "ḍaka", "ḍhaka", "dhamma", "dhamma 1"]
+
+
+def test_aspirates_are_single_letters():
+    # "kh" follows all words with "k" and any other letter
+    assert sort_key("kha") > sort_key("kū")
+    assert sort_key("ḍha") > sort_key("ḍo")
+
+
+def test_unknown_characters_go_first():
+    assert sort_pali(["ka", "ya", "xa", "Ka"]) == ["Ka", "xa", "ka", "ya"]
+
+
+def test_sort_items_by_key():
+    rows = [("ca", 1), ("a", 2), ("ca", 0)]
+    assert sort_pali(rows, key=lambda row: row[0]) == [("a", 2), ("ca", 1), ("ca", 0)]
+
+
+def test_sorter_is_fixed():
+    assert sorter.sort_key("kha") == sort_key("kha")
@@ -0,0 +1,82 @@
+import re
+
+import pandas
+import pytest
+
+from inflection_generator import engine, manifest, memo, modules, patterns, planner, settings
+from inflection_generator.helpers import excel_index
+from inflection_generator.patterns import compile_pattern
+from inflection_generator.planner import WorkPlan
+
+
+def inflect_reference(pattern, stem):
+    """ Loop over cells of the exported pattern which the engine replaced
+    """
+    inflections_string = ""
+    for row in pattern.rows:
+        for line in row[1::2]:
+            line = re.sub(r"(.+)", f"{stem}\\1", line)
+            inflections_string += re.sub("\n", " ", line) + " "
+    return inflections_string
+
+
+@pytest.fixture
+def pattern():
+    # Cells with several suffixes, an empty cell and an empty suffix line
+    data = [
+        ["", "masc sg", "", "masc pl", ""],
+        ["nom", "o", "masc nom sg", "ā\nāse", "masc nom pl"],
+        ["acc", "aṃ", "masc acc sg", "", "masc acc pl"],
+        ["voc", "a\n\nā", "masc voc sg", "ā", "masc voc pl"],
+    ]
+    frame = pandas.DataFrame(data, index=[3, 4, 5, 6])
+    frame.columns = [excel_index(i) for i in range(len(frame.columns))]
+    return compile_pattern("a masc", "A3:E6", "dhamma", "", frame)
+
+
+def test_inflect_is_same_as_loop(pattern):
+    stems = ["dhamm", "buddh!", "kamm*", "", "dhamm"]
+
+    assert engine.inflect(pattern, stems) == [inflect_reference(pattern, stem) for stem in stems]
+    assert engine.inflect(pattern, ["dhamm"]) == ["dhammo dhammā dhammāse dhammaṃ  dhamma  dhammā dhammā "]
+
+
+def test_suffix_vector(pattern):
+    vector = engine.suffix_vector(pattern)
+
+    assert vector.suffixes.tolist() == ["o", "ā", "āse", "aṃ", "", "a", "", "ā", "ā"]
+    assert vector.empty.tolist() == [False, False, False, False, True, False, True, False, False]
+
+
+def test_pattern_without_suffixes():
+    pattern = patterns.Pattern("empty", "", False, ("",), ())
+    assert engine.inflect(pattern, ["dhamm", "kamm"]) == ["", ""]
+
+
+def test_generated_stems(pattern, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "NEW_INFLECTIONS_FILE", tmp_path / "new inflections.csv")
+    saved = dict(patterns._registry)
+    patterns.register_patterns({"a masc": pattern})
+    memo.generation.clear()
+
+    dps_df = pandas.DataFrame({
+        "pali_1": ["dhamma 1", "dhamma 2", "dhamma 3", "ca", "sāvaka"],
+        "stem": ["dhamm", "!dhamm", "*", "-", "sāvak!"],
+        "pattern": ["a masc", "a masc", "a masc", "", "a masc"],
+    })
+    plan = WorkPlan()
+    plan.add(manifest.INFLECTIONS, dps_df["pali_1"], planner.ADDED)
+
+    try:
+        modules.generate_changed_inflected_forms(dps_df, plan)
+    finally:
+        patterns.register_patterns(saved)
+        memo.generation.clear()
+
+    assert modules.new_inflections_dict == {
+        "dhamma 1": "dhamma " + inflect_reference(pattern, "dhamm"),
+        "dhamma 2": "dhamma ",
+        "dhamma 3": "dhamma " + inflect_reference(pattern, ""),
+        "ca": "ca ",
+        "sāvaka": "sāvaka " + inflect_reference(pattern, "sāvak!"),
+    }
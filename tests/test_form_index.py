@@ -0,0 +1,39 @@
+from inflection_generator import form_index
+from inflection_generator.form_index import FormIndex
+
+
+def test_lookup(tmp_path):
+    path = tmp_path / "form index.bin"
+    form_index.build(path, [
+        ("dhamma", ["dhammo", "dhammaṃ", "dhammā"]),
+        ("kamma", ["kammaṃ", "kammā"]),
+        ("dhammā", ["dhammā"]),
+    ])
+
+    index = FormIndex.open(path)
+    assert index.exact("dhammā") == ["dhamma", "dhammā"]
+    assert index.exact("dhamm") == []
+    assert list(index.prefix("dhamm")) == ["dhammaṃ", "dhammo", "dhammā"]
+    assert index.prefix("dhammā") == {"dhammā": ["dhamma", "dhammā"]}
+    index.close()
+
+
+def test_overlay(tmp_path):
+    path = tmp_path / "form index.bin"
+    form_index.build(path, [("dhamma", ["dhammo"]), ("kamma", ["kammaṃ"])])
+
+    index = FormIndex.open(path)
+    index.update([("dhamma", ["dhammā"]), ("buddha", ["buddho"])], removed=["kamma"])
+    index.close()
+
+    index = FormIndex.open(path)
+    assert index.exact("dhammo") == []
+    assert index.exact("dhammā") == ["dhamma"]
+    assert index.prefix("k") == {}
+    assert index.headwords() == {"dhamma", "buddha"}
+    index.close()
+
+    form_index.build(path, [("dhamma", ["dhammo"])])
+    index = FormIndex.open(path)
+    assert not index.overlay
+    index.close()
@@ -0,0 +1,35 @@
+import pandas
+
+from inflection_generator.modules import WordCategories, comparison_table, highlight_words, read_words
+
+
+def test_highlight_words():
+    words_df = pandas.DataFrame({
+        "Pali": ["evaṃ", "me", "sutaṃ", "ekaṃ", "evaṃ"],
+        "Inflection": [True] * 5,
+        "Meaning": [True, False, True, True, False],
+        "Eg1": [False, True, True, True, True],
+        "Eg2": [True, True, False, True, True],
+        "Eg3": [True, True, True, True, True],
+    })
+
+    text, highlighted = highlight_words("evaṃ me sutaṃ\nekaṃ samayaṃ me me\n", words_df)
+
+    assert text == (
+        '<span class="red">evaṃ</span> <span class="highlight">me</span> <span class="green">sutaṃ</span>\n'
+        'ekaṃ samayaṃ <span class="highlight">me</span> <span class="highlight">me</span>\n')
+    assert highlighted == {"highlight": ["me", "evaṃ"], "red": ["evaṃ"], "green": ["sutaṃ"], "blue": []}
+
+
+def test_line_final_words_are_highlighted(tmp_path):
+    path = tmp_path / "sutta.txt"
+    path.write_text("evaṃ me sutaṃ\nekaṃ samayaṃ bhagavā\n")
+    categories = WordCategories({"evaṃ", "sutaṃ"}, {"evaṃ", "me", "sutaṃ", "ekaṃ", "samayaṃ"}, {"sutaṃ"}, set(), set())
+
+    words_df = comparison_table(read_words(path), categories)
+    text, highlighted = highlight_words(path.read_text(), words_df)
+
+    assert text == (
+        'evaṃ me <span class="red">sutaṃ</span>\n'
+        'ekaṃ samayaṃ <span class="highlight">bhagavā</span>\n')
+    assert highlighted == {"highlight": ["bhagavā"], "red": ["sutaṃ"], "green": [], "blue": []}
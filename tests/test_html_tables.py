@@ -0,0 +1,53 @@
+import pandas
+import pytest
+
+from inflection_generator import manifest, memo, modules, patterns, planner, settings
+from inflection_generator.helpers import Kind
+from inflection_generator.modules import InflectionTableGenerator
+from inflection_generator.patterns import compile_pattern
+from inflection_generator.planner import WorkPlan
+
+
+@pytest.fixture
+def generator(declensions):
+    saved = dict(patterns._registry)
+    patterns.register_patterns({"a masc": compile_pattern("a masc", "A3:E5", "dhamma", "", declensions)})
+    memo.generation.clear()
+
+    index = pandas.DataFrame([["a masc", "A3:E5", "dhamma"]])
+    headwords = pandas.DataFrame({
+        "pali_1": ["dhamma", "buddha", "ca", "sāvaka 1", "dhamma"],
+        "stem": ["dhamm", "buddh", "-", "sāvak", "!"],
+        "pattern": ["a masc", "a masc", "", "a masc", "a masc"],
+        "pos": ["masc", "masc", "ind", "masc", "masc"],
+    })
+    yield InflectionTableGenerator(headwords, index, Kind.SBS)
+
+    patterns.register_patterns(saved)
+    memo.generation.clear()
+
+
+@pytest.mark.parametrize("stem", ["dhamm", "", "buddh"])
+def test_compiled_table_is_same_as_made_one(generator, stem):
+    table = stem.join(generator._compile_table("a masc"))
+    assert table == generator._make_table(stem, "a masc")
+    assert f"{stem}<b>ā</b><br>{stem}<b>āse</b>" in table
+
+
+def test_parallel_html_is_same_as_serial(generator, monkeypatch, tmp_path):
+    monkeypatch.setattr(modules, "create_directories", lambda: None)
+    monkeypatch.setattr(modules, "HTML_CHUNK_SIZE", 1)
+    plan = WorkPlan()
+    plan.add(manifest.HTML_TABLES_SBS, ["dhamma", "buddha", "ca", "sāvaka 1"], planner.ADDED)
+
+    written = {}
+    for jobs in [1, 2]:
+        monkeypatch.setattr(settings, "HTML_TABLES_SBS_DIR", tmp_path / str(jobs))
+        (tmp_path / str(jobs)).mkdir()
+        generator.generate_html(plan, jobs)
+        written[jobs] = {path.name: path.read_text() for path in (tmp_path / str(jobs)).iterdir()}
+
+    assert written[1] == written[2]
+    assert sorted(written[1]) == ["buddha.html", "ca.html", "dhamma.html", "sāvaka 1.html"]
+    assert "<b>sāvaka</b> is <b>a masc</b>" in written[1]["sāvaka 1.html"]
+    assert "click on <b>a masc</b>" in written[1]["dhamma.html"]
@@ -0,0 +1,18 @@
+from inflection_generator.inflections_log import InflectionsFile
+
+
+def test_merged_view_and_compaction(tmp_path):
+    inflections_file = InflectionsFile(tmp_path / "all inflections.csv")
+    inflections_file.append(upserts=[("dhamma", "dhamma dhammo "), ("kamma", "kamma kammaṃ ")])
+    inflections_file.compact()
+    assert not inflections_file.log_path.exists()
+
+    inflections_file.append(upserts=[("buddha", "buddha buddho "), ("dhamma", "dhamma dhammā ")])
+    inflections_file.append(deletes=["kamma", "buddha"])
+    inflections_file.append(upserts=[("buddha", "buddha ")])
+
+    merged = inflections_file.read()
+    assert merged.values.tolist() == [["dhamma", "dhamma dhammā "], ["buddha", "buddha "]]
+
+    inflections_file.compact()
+    assert inflections_file.read().values.tolist() == merged.values.tolist()
@@ -0,0 +1,136 @@
+import pickle
+
+import pandas
+import pytest
+
+from inflection_generator import manifest, modules, patterns, planner, settings
+from inflection_generator.helpers import Kind
+from inflection_generator.manifest import ChangeManifest
+from inflection_generator.planner import WorkPlan
+
+
+@pytest.fixture
+def data():
+    return pandas.DataFrame({
+        'pali_1': ["kamma 1", "kamma 2", "dhamma"],
+        "stem": ["kamm", "kamm", "dhamm"],
+        "pattern": ["a nt", "a nt", "a masc"],
+        'pos': ["nt", "nt", "masc"],
+    })
+
+
+def fingerprints(data, artifact):
+    return manifest.fingerprint(data, manifest.ARTIFACT_COLUMNS[artifact])
+
+
+def test_diff(tmp_path, data):
+    change_manifest = ChangeManifest(tmp_path / "manifest.pickle")
+    change_manifest.update(manifest.TABLE_LISTS, fingerprints(data, manifest.TABLE_LISTS))
+
+    data.loc[2, 'pos'] = "adj"
+    data.loc[3] = ["buddha", "buddh", "a masc", "masc"]
+    diff = change_manifest.diff(manifest.TABLE_LISTS, fingerprints(data, manifest.TABLE_LISTS))
+
+    assert list(diff.index[diff["added"]]) == ["buddha"]
+    assert list(diff.index[diff["changed"]]) == ["dhamma"]
+
+
+def test_save_and_load(tmp_path, data):
+    path = tmp_path / "manifest.pickle"
+    change_manifest = ChangeManifest(path)
+    change_manifest.update(manifest.INFLECTIONS, fingerprints(data, manifest.INFLECTIONS))
+    change_manifest.save()
+
+    loaded = ChangeManifest.load(path)
+    diff = loaded.diff(manifest.INFLECTIONS, fingerprints(data, manifest.INFLECTIONS))
+    assert not (diff["added"] | diff["changed"]).any()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_prune(tmp_path, data):
+    change_manifest = ChangeManifest(tmp_path / "manifest.pickle")
+    change_manifest.update(manifest.INFLECTIONS, fingerprints(data, manifest.INFLECTIONS))
+    assert change_manifest.prune(["kamma 1", "dhamma", "buddha"]) == {"kamma 2"}
+    assert list(change_manifest.fingerprints[manifest.INFLECTIONS].index) == ["kamma 1", "dhamma"]
+
+
+def test_import_legacy_dir(tmp_path, monkeypatch, data):
+    legacy_dir = tmp_path / "pickle test"
+    legacy_dir.mkdir()
+    with open(legacy_dir / "dhamma", "wb") as pickle_file:
+        pickle.dump("dhamma dhamm a masc", pickle_file)
+    monkeypatch.setattr(settings, "LEGACY_PICKLE_TEST_DIR", legacy_dir)
+
+    change_manifest = ChangeManifest.load(tmp_path / "manifest.pickle")
+    diff = change_manifest.diff(manifest.INFLECTIONS, fingerprints(data, manifest.INFLECTIONS))
+    assert list(diff.index[~diff["added"]]) == ["dhamma"]
+    assert not diff["changed"].any()
+
+
+def test_pattern_index_sync(tmp_path, data):
+    change_manifest = ChangeManifest(tmp_path / "manifest.pickle")
+    inflections = fingerprints(data, manifest.INFLECTIONS)
+    change_manifest.sync_pattern_index(data, change_manifest.diff(manifest.INFLECTIONS, inflections))
+    change_manifest.update(manifest.INFLECTIONS, inflections)
+    assert change_manifest.pattern_index.headwords("a nt") == {"kamma 1", "kamma 2"}
+
+    data.loc[1, "pattern"] = "a masc"
+    inflections = fingerprints(data, manifest.INFLECTIONS)
+    change_manifest.sync_pattern_index(data, change_manifest.diff(manifest.INFLECTIONS, inflections))
+    assert change_manifest.pattern_index.dependents(["a nt"]) == {"kamma 1"}
+    assert change_manifest.pattern_index.dependents(["a masc"]) == {"kamma 2", "dhamma"}
+
+    change_manifest.prune(["kamma 1", "kamma 2"])
+    assert change_manifest.pattern_index.headwords("a masc") == {"kamma 2"}
+
+
+def test_prune_artifacts(tmp_path, data):
+    change_manifest = ChangeManifest(tmp_path / "manifest.pickle")
+    for artifact in [manifest.INFLECTIONS, manifest.HTML_TABLES_DPS, manifest.HTML_TABLES_SBS]:
+        change_manifest.update(artifact, fingerprints(data, manifest.INFLECTIONS))
+
+    assert change_manifest.prune(["dhamma"], [manifest.HTML_TABLES_SBS]) == {"kamma 1", "kamma 2"}
+    assert list(change_manifest.fingerprints[manifest.HTML_TABLES_SBS].index) == ["dhamma"]
+    assert len(change_manifest.fingerprints[manifest.HTML_TABLES_DPS]) == 3
+    assert len(change_manifest.fingerprints[manifest.INFLECTIONS]) == 3
+
+
+def test_legacy_html_tables_are_dropped(tmp_path, data):
+    path = tmp_path / "manifest.pickle"
+    change_manifest = ChangeManifest(path)
+    change_manifest.update(manifest.LEGACY_HTML_TABLES, fingerprints(data, manifest.TABLE_LISTS))
+    change_manifest.save()
+
+    assert manifest.LEGACY_HTML_TABLES not in ChangeManifest.load(path).fingerprints
+
+
+def test_html_tables_of_kinds_are_planned_for_their_headwords(tmp_path, monkeypatch, data):
+    monkeypatch.setattr(settings, "INFLECTIONS_STORE_FILE", tmp_path / "inflections.db")
+    monkeypatch.setattr(settings, "INFLECTIONS_DIR", tmp_path / "inflections")
+    monkeypatch.setattr(settings, "INFLECTIONS_TRANSLIT_DIR", tmp_path / "inflections translit")
+    kinds_data = {Kind.DPS: data, Kind.SBS: data[data['pali_1'] == "kamma 1"]}
+
+    # All artifacts were generated by the previous run
+    change_manifest = ChangeManifest(tmp_path / "manifest.pickle")
+    change_manifest.sync_pattern_index(data, change_manifest.diff(
+        manifest.INFLECTIONS, fingerprints(data, manifest.INFLECTIONS)))
+    for artifact in manifest.SHARED_ARTIFACTS:
+        change_manifest.update(artifact, fingerprints(data.assign(like=""), artifact))
+    for kind, kind_data in kinds_data.items():
+        change_manifest.update(
+            manifest.HTML_TABLES[kind], fingerprints(kind_data.assign(like=""), manifest.HTML_TABLES[kind]))
+    monkeypatch.setattr(ChangeManifest, "load", lambda: change_manifest)
+    monkeypatch.setattr(patterns, "registry", dict)
+
+    plan = WorkPlan(
+        planner.stages(kinds_data),
+        {manifest.HTML_TABLES[kind]: kind_data['pali_1'] for kind, kind_data in kinds_data.items()})
+    modules.test_for_differences_in_stem_and_pattern(data, plan, ["a nt"], kinds_data)
+    # Inflections of no headword are stored
+    modules.test_if_inflections_exist_dps(data, plan, read_only=True)
+
+    for stage in [manifest.INFLECTIONS, manifest.HTML_TABLES_DPS]:
+        assert plan.items(stage) == {
+            "kamma 1": planner.PATTERN_CHANGED, "kamma 2": planner.PATTERN_CHANGED,
+            "dhamma": planner.MISSING_INFLECTIONS}
+    assert plan.items(manifest.HTML_TABLES_SBS) == {"kamma 1": planner.PATTERN_CHANGED}
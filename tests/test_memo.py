@@ -0,0 +1,47 @@
+from inflection_generator.memo import LruMemo, Memo
+
+
+def test_get_many_computes_only_missing_keys():
+    memo = Memo("test")
+    memo.get("a", lambda: "A")
+    calls = []
+
+    def compute_many(keys):
+        calls.append(keys)
+        return [key.upper() for key in keys]
+
+    assert memo.get_many(["a", "b", "c", "b", "a"], compute_many) == ["A", "B", "C", "B", "A"]
+    assert calls == [["b", "c"]]
+    assert (memo.hits, memo.misses) == (3, 3)
+    assert memo.summary() == "test: 3 hits, 3 misses, 50.0% hit rate"
+
+
+def test_get_many_all_missing():
+    memo = Memo("test")
+    calls = []
+
+    def compute_many(keys):
+        calls.append(keys)
+        return [len(key) for key in keys]
+
+    assert memo.get_many(["aa", "b", "aa"], compute_many) == [2, 1, 2]
+    assert calls == [["aa", "b"]]
+    assert (memo.hits, memo.misses) == (1, 2)
+
+    assert memo.get_many(["b", "aa"], compute_many) == [1, 2]
+    assert memo.get_many([], compute_many) == []
+    assert calls == [["aa", "b"]]
+    assert (memo.hits, memo.misses) == (3, 2)
+
+
+def test_least_recently_used_value_is_dropped():
+    memo = LruMemo("test", maxsize=2)
+    memo.get("a", lambda: 1)
+    memo.get("b", lambda: 2)
+    memo.get("a", lambda: 0)
+    memo.get_many(["c"], lambda keys: [3])
+
+    assert len(memo) == 2
+    assert memo.get("a", lambda: 0) == 1
+    assert memo.get("b", lambda: 0) == 0
+    assert (memo.hits, memo.misses) == (2, 4)
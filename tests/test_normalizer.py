@@ -0,0 +1,98 @@
+import random
+import re
+from pathlib import Path
+
+import pandas
+import pytest
+
+from inflection_generator import normalizer, settings
+
+
+def clean_machine_reference(text):
+    """ Chain of substitutions replaced by the normalizer
+    """
+    text = text.lower()
+    text = re.sub(r"\d", "", text)
+    text = re.sub(r"\.", "", text)
+    text = re.sub("/", "", text)
+    text = re.sub(r"\:", "", text)
+    text = re.sub(r"\;", "", text)
+    text = re.sub(",", " ", text)
+    text = re.sub("‘", "", text)
+    text = re.sub("'", "", text)
+    text = re.sub(";", "", text)
+    text = re.sub("’", "", text)
+    text = re.sub(" ̓ ", " ", text)
+    text = re.sub(r"\’", "", text)
+    text = re.sub("\"", "", text)
+    text = re.sub("!", "", text)
+    text = re.sub(r"\?", "", text)
+    text = re.sub(r"\+", "", text)
+    text = re.sub("=", "", text)
+    text = re.sub("﻿", "", text)
+    text = re.sub("⇒", "", text)
+    text = re.sub("§", " ", text)
+    text = re.sub(r"\(", "", text)
+    text = re.sub(r"\)", "", text)
+    text = re.sub("-", "", text)
+    text = re.sub("–", "", text)
+    text = re.sub(r"\—", " ", text)
+    text = re.sub("\t", " ", text)
+    text = re.sub("…", " ", text)
+    text = re.sub("–", "", text)
+    text = re.sub("  ", " ", text)
+    text = re.sub("^ ", "", text)
+    text = re.sub("^ ", "", text)
+    text = re.sub("^ ", "", text)
+    text = re.sub(r"\[", "", text)
+    text = re.sub(r"\]", "", text)
+    text = re.sub("ṁ", "ṃ", text)
+    text = re.sub("〈", "", text)
+    text = re.sub("〉", "", text)
+    text = re.sub(r"\*", "", text)
+    text = re.sub("☸", "", text)
+    text = re.sub("suttaṃ", "suttaṃ\n", text)
+    text = re.sub("next", "next\n", text)
+    return text
+
+
+@pytest.mark.parametrize("text", [
+    "    Evaṃ me sutaṃ, ekaṃ samayaṃ.\n  Bhagavā ",
+    "x ̓ y ̓. z ̓§w",
+    "[ a ]  b\t\tc … d — e",
+    "Brahmajālasuttaṁ Next\nnext",
+    "٣ ३ 3 ² ½ dhamma",
+    " \n  x",
+    "",
+])
+def test_same_as_reference(text):
+    assert normalizer.clean_machine(text) == clean_machine_reference(text)
+
+
+def test_same_as_reference_on_random_text():
+    alphabet = list("aṃṁkN3३ \n\t,.;'’‘\"!?+=﻿⇒§()-–—…[]〈〉*☸̓") + ["suttaṃ", "next", "  "]
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert normalizer.clean_machine(text) == clean_machine_reference(text), repr(text)
+
+
+def _corpus_files():
+    table = pandas.read_csv(
+        Path(__file__).parent.parent / settings.SUTTA_CORRESPONDENCE_FILE, sep="\t", dtype=str, keep_default_na=False)
+    return sorted({name for column in ["mūla", "aṭṭhakathā", "ṭīkā"] for name in table[column] if name})
+
+
+@pytest.mark.skipif(not settings.CSCD_DIR.is_dir(), reason="CSCD corpus is not available")
+def test_same_as_reference_on_corpus():
+    checked = 0
+    for name in _corpus_files():
+        path = settings.CSCD_DIR / name
+        if not path.is_file():
+            continue
+        with open(path) as text_file:
+            cleaned = "".join(normalizer.clean_lines(text_file))
+        with open(path) as text_file:
+            assert cleaned == clean_machine_reference(text_file.read()), name
+        checked += 1
+    assert checked
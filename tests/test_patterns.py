@@ -0,0 +1,72 @@
+import pytest
+
+from conftest import DECLENSIONS_ROWS
+from inflection_generator import patterns
+from inflection_generator.patterns import compile_pattern
+
+
+@pytest.fixture
+def pattern(declensions):
+    return compile_pattern("a masc", "A3:E5", "dhamma", "", declensions)
+
+
+def test_compile(pattern):
+    assert pattern.like == "dhamma"
+    assert not pattern.irreg
+    assert pattern.header == ("", "masc sg", "", "masc pl", "")
+    assert pattern.labels == ("nom", "acc")
+    assert pattern.columns == ("masc sg", "masc pl")
+    assert pattern.cells == (("o", "ā\nāse"), ("aṃ", "e"))
+    assert pattern.suffixes[0][1] == ("ā", "āse")
+
+
+def test_wrong_cell_range(declensions):
+    with pytest.raises(ValueError):
+        compile_pattern("a masc", "A3-E5", "dhamma", "", declensions)
+
+
+def test_table_columns_as_read_from_csv(pattern):
+    table = pattern.to_table()
+    assert list(table.columns) == ["masc sg", "Unnamed: 2", "masc pl", "Unnamed: 4"]
+    assert list(table.index) == ["nom", "acc"]
+
+
+@pytest.fixture
+def registry():
+    saved = dict(patterns._registry)
+    yield
+    patterns.register_patterns(saved)
+
+
+def test_unchanged_workbook_reuses_store(workbook_file, tmp_path, monkeypatch, registry):
+    store_file = tmp_path / "patterns.pickle"
+
+    compiled = patterns.load_pattern_store(workbook_file, store_file)
+    assert compiled.compiled
+    assert compiled.changed == ["a masc"]
+    assert compiled.patterns["a masc"].cells == (("o", "ā\nāse"), ("aṃ", "e"))
+    compiled.save(store_file)
+
+    def read_index(_path):
+        raise AssertionError("workbook is parsed")
+
+    monkeypatch.setattr(patterns, "read_index", read_index)
+    loaded = patterns.load_pattern_store(workbook_file, store_file)
+
+    assert not loaded.compiled
+    assert loaded.changed == []
+    assert loaded.patterns == compiled.patterns
+    assert patterns.get_pattern("a masc") == compiled.patterns["a masc"]
+
+
+def test_edited_pattern_is_changed(make_workbook, tmp_path, registry):
+    store_file = tmp_path / "patterns.pickle"
+    patterns.load_pattern_store(make_workbook("declensions.xlsx"), store_file).save(store_file)
+
+    rows = [list(row) for row in DECLENSIONS_ROWS]
+    rows[4][3] = "e\nāni"
+    edited = patterns.load_pattern_store(make_workbook("edited declensions.xlsx", rows), store_file)
+
+    assert edited.compiled
+    assert edited.changed == ["a masc"]
+    assert edited.patterns["a masc"].suffixes[1][1] == ("e", "āni")
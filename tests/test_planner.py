@@ -0,0 +1,33 @@
+from inflection_generator import manifest, planner
+from inflection_generator.helpers import Kind
+from inflection_generator.planner import WorkPlan
+
+
+def test_first_reason_is_kept():
+    plan = WorkPlan()
+    plan.add(manifest.HTML_TABLES_DPS, ["dhamma"], planner.CHANGED)
+    plan.add_to_all(["dhamma", "kamma"], planner.PATTERN_CHANGED)
+
+    assert plan.items(manifest.HTML_TABLES_DPS) == {
+        "dhamma": planner.CHANGED, "kamma": planner.PATTERN_CHANGED}
+    assert plan.needs(manifest.INFLECTIONS, "kamma")
+    assert not plan.needs(manifest.INFLECTIONS, "buddha")
+
+
+def test_stages_of_kinds():
+    plan = WorkPlan(planner.stages([Kind.SBS]))
+    plan.add_to_all(["dhamma"], planner.ADDED)
+
+    assert plan.stages == [manifest.INFLECTIONS, manifest.TABLE_LISTS, manifest.HTML_TABLES_SBS]
+    assert plan.needs(manifest.HTML_TABLES_SBS, "dhamma")
+
+
+def test_stage_headwords():
+    plan = WorkPlan(
+        planner.stages([Kind.DPS, Kind.SBS]),
+        {manifest.HTML_TABLES_DPS: ["dhamma", "kamma"], manifest.HTML_TABLES_SBS: ["dhamma"]})
+    plan.add_to_all(["dhamma", "kamma"], planner.PATTERN_CHANGED)
+
+    assert list(plan.items(manifest.INFLECTIONS)) == ["dhamma", "kamma"]
+    assert list(plan.items(manifest.HTML_TABLES_DPS)) == ["dhamma", "kamma"]
+    assert list(plan.items(manifest.HTML_TABLES_SBS)) == ["dhamma"]
@@ -0,0 +1,63 @@
+import pickle
+import sqlite3
+
+import pytest
+
+from inflection_generator import modules, settings, store
+from inflection_generator.store import InflectionStore
+
+
+def test_upsert_and_delete(tmp_path):
+    with InflectionStore(tmp_path / "inflections.sqlite") as inflection_store:
+        inflection_store.upsert(store.INFLECTIONS, [("dhamma", ["dhammo", "dhammaṃ"]), ("kamma", [])])
+        inflection_store.upsert(store.INFLECTIONS, [("dhamma", ["dhammo"])])
+
+        assert inflection_store.get(store.INFLECTIONS, "dhamma") == ["dhammo"]
+        assert inflection_store.get(store.INFLECTIONS, "kamma") == []
+        assert (store.INFLECTIONS, "kamma") in inflection_store
+        assert (store.INFLECTIONS_TRANSLIT, "kamma") not in inflection_store
+
+        assert inflection_store.prune(store.INFLECTIONS, ["dhamma"]) == ["kamma"]
+        assert inflection_store.headwords(store.INFLECTIONS) == {"dhamma"}
+
+
+def test_legacy_dir(tmp_path):
+    legacy_dir = tmp_path / "inflections"
+    legacy_dir.mkdir()
+    with open(legacy_dir / "dhamma", "wb") as pickle_file:
+        pickle.dump(["dhammo"], pickle_file)
+    (legacy_dir / "kamma").touch()
+
+    with InflectionStore(tmp_path / "inflections.sqlite") as inflection_store:
+        assert inflection_store.import_legacy_dir(store.INFLECTIONS, legacy_dir) == 1
+        inflection_store.upsert(store.INFLECTIONS, [("buddha", ["buddho"])])
+
+        assert inflection_store.export_legacy_dir(store.INFLECTIONS, legacy_dir) == ["kamma"]
+
+    with open(legacy_dir / "buddha", "rb") as pickle_file:
+        assert pickle.load(pickle_file) == ["buddho"]
+    assert sorted(path.name for path in legacy_dir.iterdir()) == ["buddha", "dhamma"]
+
+
+def test_read_only(tmp_path):
+    path = tmp_path / "output dir" / "inflections.sqlite"
+    with InflectionStore(path) as inflection_store:
+        inflection_store.upsert(store.INFLECTIONS, [("dhamma", ["dhammo"])])
+    content = path.read_bytes()
+
+    with InflectionStore(path, read_only=True) as inflection_store:
+        assert inflection_store.headwords(store.INFLECTIONS) == {"dhamma"}
+        with pytest.raises(sqlite3.OperationalError):
+            inflection_store.upsert(store.INFLECTIONS, [("kamma", [])])
+
+    assert path.read_bytes() == content
+
+
+def test_stored_headwords_read_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "INFLECTIONS_STORE_FILE", tmp_path / "inflections.sqlite")
+    monkeypatch.setattr(settings, "INFLECTIONS_DIR", tmp_path / "inflections")
+    (tmp_path / "inflections").mkdir()
+    (tmp_path / "inflections" / "dhamma").touch()
+
+    assert modules.stored_headwords(store.INFLECTIONS, read_only=True) == {"dhamma"}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["inflections"]
@@ -0,0 +1,66 @@
+import pytest
+
+from inflection_generator import suttas
+from inflection_generator.modules import WordCategories
+
+TABLE = {
+    "dn1": {"mūla": "mul0.txt", "aṭṭhakathā": "att1.txt", "ṭīkā": "tik1.txt"},
+    "dn2": {"mūla": "mul1.txt", "aṭṭhakathā": "att1.txt", "ṭīkā": ""},
+    "sbs-f": {"mūla": "sbs.txt", "aṭṭhakathā": "", "ṭīkā": ""},
+    "sbs": {"mūla": "sbs.txt", "aṭṭhakathā": "", "ṭīkā": ""},
+}
+
+
+def test_select_suttas():
+    assert suttas.select_suttas(["dn2", "dn1"], TABLE) == ["dn2", "dn1"]
+    assert suttas.select_suttas(["dn1-sbs-f"], TABLE) == ["dn1", "dn2", "sbs-f"]
+    assert suttas.select_suttas(["sbs-f", "all"], TABLE) == ["sbs-f", "dn1", "dn2", "sbs"]
+
+    with pytest.raises(ValueError):
+        suttas.select_suttas(["dn1-dn9"], TABLE)
+
+
+def test_texts_of_suttas():
+    assert suttas.texts_of_suttas(["dn1", "dn2"], TABLE) == [
+        suttas.Text("mul0.txt", True), suttas.Text("att1.txt", False), suttas.Text("tik1.txt", False),
+        suttas.Text("mul1.txt", True)]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_analyse_texts(tmp_path, jobs):
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    input_dir.mkdir()
+    output_dir.mkdir()
+    (input_dir / "mul.txt").write_text("Evaṃ me sutaṃ. Ekaṃ samayaṃ...\n")
+    (input_dir / "att.txt").write_text("Evaṃ me sutanti.\n")
+
+    categories = WordCategories({"evaṃ", "me"}, {"evaṃ"}, {"me"}, set(), set())
+    texts = [suttas.Text("mul.txt", True), suttas.Text("att.txt", False), suttas.Text("missing.txt", False)]
+
+    assert suttas.analyse_texts(texts, categories, jobs, input_dir, output_dir) == ["missing.txt"]
+
+    # Words are in the Pāli order, indexes are their positions in the text
+    table_lines = (output_dir / "mul.txt.csv").read_text().splitlines()
+    assert table_lines[:3] == [
+        "\tPali\tInflection\tMeaning\tEg1\tEg2\tEg3", "3\tekaṃ\tFalse\tFalse\tTrue\tTrue\tTrue",
+        "0\tevaṃ\tTrue\tTrue\tTrue\tTrue\tTrue"]
+    assert [line.split("\t")[1] for line in table_lines[1:]] == ["ekaṃ", "evaṃ", "me", "samayaṃ", "sutaṃ"]
+    assert (output_dir / "att.txt.csv").read_text().splitlines()[0] == "\tPali\tInflection\tMeaning"
+    assert '<span class="highlight">me</span>' in (output_dir / "mul.txt.html").read_text()
+    assert not (output_dir / "att.txt.html").exists()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_scan_corpus(tmp_path, jobs):
+    (tmp_path / "s0101m.mul0.txt").write_text("Evaṃ me sutaṃ. Ekaṃ samayaṃ...\n")
+    (tmp_path / "s0101m.mul1.txt").write_text("Evaṃ me sutaṃ\n")
+    (tmp_path / "s0101a.att0.txt").write_text("Evaṃ me sutanti.\n")
+
+    corpus_coverage = suttas.scan_corpus(suttas.corpus_files(tmp_path), {"evaṃ", "me"}, jobs)
+
+    assert corpus_coverage.books().values.tolist() == [
+        ["s0101a", 1, 3, 2, 2 / 3],
+        ["s0101m", 2, 8, 4, 0.5],
+        ["all", 3, 11, 6, 6 / 11]]
+    assert corpus_coverage.top_unrecognised(2) == [("sutaṃ", 2), ("ekaṃ", 1)]
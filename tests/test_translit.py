@@ -0,0 +1,25 @@
+from inflection_generator import translit
+from inflection_generator.translit import TokenCache
+
+
+def test_token_cache(tmp_path):
+    token_cache = TokenCache(tmp_path / "translit cache.pickle")
+    assert token_cache.transliterate(["dhammo saṅgho "]) == ["дхаммо сан̇гхо धम्मो संघो "]
+
+    token_cache.save()
+    loaded = TokenCache.load(tmp_path / "translit cache.pickle")
+    assert loaded.transliterate(["saṅgho dhammo "]) == ["сан̇гхо дхаммо संघो धम्मो "]
+    assert not loaded.misses
+
+    assert not TokenCache.load(tmp_path / "translit cache.pickle", translit.AKSHARAMUKHA)
+
+
+def test_transliterate_lines_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(translit, "CHUNK_SIZE", 2)
+    lines = [f"dhamma {i}\tdhamma{'ṃ' * (i % 3)} saṅgh{i} " for i in range(9)]
+
+    serial = list(translit.transliterate_lines(lines, TokenCache(tmp_path / "serial.pickle")))
+    parallel = list(translit.transliterate_lines(lines, TokenCache(tmp_path / "parallel.pickle"), jobs=2))
+
+    assert parallel == serial
+    assert serial[1] == lines[1] + "дхаммам̣ сан̇гх1 धम्मं संघ्१ "
@@ -0,0 +1,45 @@
+import pytest
+
+from inflection_generator import settings, translit, transliterator
+from inflection_generator.inflections_log import InflectionsFile
+
+
+@pytest.mark.parametrize("token, cyrillic, devanagari", [
+    ("dhammaṃ", "дхаммам̣", "धम्मं"),
+    ("buddhānaṃ", "буддха̄нам̣", "बुद्धानं"),
+    ("saṃyoga", "сам̣йога", "संयोग"),
+    ("aṅṅa", "ан̇н̇а", "अङ्ङ"),
+    ("ṅk", "н̇к", "ङ्क्"),
+    ("kaḷa", "кал̣а", "कऌअ"),
+    ("oṃ", "ом̣", "ॐ"),
+    ("oṃkāra", "ом̣ка̄ра", "ओंकार"),
+    ("Karw3", "карw3", "कर्w३"),
+])
+def test_samples(token, cyrillic, devanagari):
+    assert transliterator.to_cyrillic(token) == cyrillic
+    assert transliterator.to_devanagari(token) == devanagari
+
+
+def test_unsupported():
+    assert not transliterator.is_supported("qa")
+    with pytest.raises(ValueError):
+        transliterator.to_devanagari("dhamma.")
+
+
+def test_parity_with_aksharamukha():
+    """ Every token of all inflections is transliterated as aksharamukha does
+    """
+    pytest.importorskip("aksharamukha")
+    if not settings.ALL_INFLECTIONS_FILE.exists():
+        pytest.skip(f"{settings.ALL_INFLECTIONS_FILE} does not exist")
+
+    all_inflections = InflectionsFile(settings.ALL_INFLECTIONS_FILE).read()
+    tokens = sorted({token for inflections in all_inflections[1] for token in inflections.split()})
+
+    native = translit.ENGINES[translit.NATIVE](tokens)
+    aksharamukha = translit.ENGINES[translit.AKSHARAMUKHA](tokens)
+
+    differences = [
+        token for token, native_pair, aksharamukha_pair in zip(tokens, native, aksharamukha)
+        if native_pair != aksharamukha_pair]
+    assert not differences
@@ -0,0 +1,29 @@
+import pandas
+
+from inflection_generator import workbook
+
+
+def test_sheets(workbook_file):
+    sheets = workbook.load_workbook(workbook_file)
+
+    assert sheets.index.values.tolist() == [["a masc", "A3:E5", "dhamma", ""]]
+    assert sheets.declensions.iloc[2].tolist() == ["nom", "o", "masc nom sg", "ā\nāse", "masc nom pl"]
+    assert sheets.abbreviations["name"].tolist() == ["nom", "masc"]
+    assert pandas.isna(sheets.abbreviations["cyrl"][1])
+
+
+def test_sheets_are_parsed_once_on_demand(workbook_file, monkeypatch):
+    parsed = []
+    parse = pandas.ExcelFile.parse
+
+    def counting_parse(excel_file, sheet_name, **kwargs):
+        parsed.append(sheet_name)
+        return parse(excel_file, sheet_name, **kwargs)
+
+    monkeypatch.setattr(pandas.ExcelFile, "parse", counting_parse)
+
+    first = workbook.load_workbook(workbook_file).abbreviations
+    assert parsed == ["abbreviations"]
+
+    assert workbook.load_workbook(str(workbook_file)).abbreviations is first
+    assert parsed == ["abbreviations"]